@@ -0,0 +1,59 @@
+"""Кэши на диске и хранилище прогнозов в памяти."""
+import os
+import time
+import weather_core
+from weather_core import DiskCache, FileCache, ForecastStore
+
+
+def test_disk_cache_expires_entries(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "cache.json"), ttl=60, max_entries=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now = time.time()
+    monkeypatch.setattr(weather_core.time, "time", lambda: now + 61)
+    assert cache.get("a") is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.json"), ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" использован позже "b"
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_disk_cache_is_saved_to_file(tmp_path):
+    path = str(tmp_path / "cache.json")
+    DiskCache(path, ttl=60, max_entries=10).set("Москва", [55.75, 37.62])
+    assert DiskCache(path, ttl=60, max_entries=10).get("Москва") == [55.75, 37.62]
+
+
+def test_file_cache_keeps_newest_files(tmp_path):
+    cache = FileCache(str(tmp_path / "forecasts"), ttl=60, max_entries=2)
+    for i, key in enumerate(["a", "b"]):
+        cache.set(key, {"value": key})
+        # Разное время изменения файлов, даже если файловая система хранит его с точностью до секунды
+        os.utime(cache.get_path(key), (time.time() - 10 + i, time.time() - 10 + i))
+    cache.set("c", {"value": "c"})
+    assert cache.get("a") is None
+    assert cache.get("b") == {"value": "b"} and cache.get("c") == {"value": "c"}
+
+
+def test_file_cache_expires_entries(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path / "forecasts"), ttl=60, max_entries=2)
+    cache.set("a", 1)
+    now = time.time()
+    monkeypatch.setattr(weather_core.time, "time", lambda: now + 61)
+    assert cache.get("a") is None
+
+
+def test_forecast_store_rounds_coordinates_and_limits_size():
+    store = ForecastStore(max_entries=2)
+    store.set((55.75581, 37.61731), "moscow")
+    assert store.get((55.75579, 37.61729)) == "moscow"
+    store.set((59.9386, 30.3141), "spb")
+    store.set((55.0302, 82.9204), "novosibirsk")
+    assert store.get((55.7558, 37.6173)) is None
+    assert store.get((59.9386, 30.3141)) == "spb"
@@ -0,0 +1,41 @@
+"""Прореживание серий для графиков (LTTB)."""
+import numpy as np
+from weather_charts import lttb
+
+
+def make_series(n):
+    x = np.arange(n, dtype=np.float64)
+    return x, np.sin(x / 20).astype(np.float32)
+
+
+def test_short_series_is_returned_as_is():
+    x, y = make_series(40)
+    xs, ys = lttb(x, y, 50)
+    assert xs is x and ys is y
+
+
+def test_keeps_threshold_points_with_first_and_last():
+    x, y = make_series(1000)
+    xs, ys = lttb(x, y, 100)
+    assert len(xs) == len(ys) == 100
+    assert xs[0] == x[0] and xs[-1] == x[-1]
+    assert ys[0] == y[0] and ys[-1] == y[-1]
+    assert np.all(np.diff(xs) > 0)
+
+
+def test_keeps_spikes():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000, dtype=np.float32)
+    y[333] = 50
+    y[777] = -40
+    xs, ys = lttb(x, y, 50)
+    assert 333 in xs and 777 in xs
+    assert ys.max() == 50 and ys.min() == -40
+
+
+def test_points_come_from_the_original_series():
+    x, y = make_series(500)
+    y[10:20] = np.nan
+    xs, ys = lttb(x, y, 60)
+    indexes = xs.astype(np.int64)
+    assert np.array_equal(ys, y[indexes], equal_nan=True)
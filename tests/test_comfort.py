@@ -0,0 +1,51 @@
+"""Локальная оценка комфорта погоды."""
+import math
+import numpy as np
+import pytest
+from weather_comfort import comfort_index, current_comfort, conditions_changed, format_comfort, comfort_to_json
+
+
+def score(temperature, humidity, windspeed, precipitation, cloudcover):
+    values = [np.array([value], dtype=np.float32) for value in (temperature, humidity, windspeed, precipitation, cloudcover)]
+    return float(comfort_index(*values)[0])
+
+
+def make_current(**changes):
+    current = {
+        "temperature_2m": 21.0, "apparent_temperature": 21.0, "relative_humidity_2m": 50.0, "precipitation": 0.0,
+        "windspeed_10m": 5.0, "winddirection_10m": 180.0, "cloudcover": 0.0, "weathercode": 0.0
+    }
+    current.update(changes)
+    return current
+
+
+def test_ideal_weather_scores_ten():
+    assert score(21, 50, 5, 0, 0) == 10.0
+
+
+def test_reference_conditions():
+    assert score(-10, 80, 20, 0, 0) == 3.0  # Мороз с ветром: штраф за холод упирается в максимум
+    assert score(35, 60, 5, 0, 0) == 3.0  # Жара: индекс жары около 45°C
+    assert score(20, 60, 5, 2, 100) == 6.0  # Дождь 2 мм/ч и сплошная облачность
+    assert score(20, 60, 45, 0, 0) == pytest.approx(8.4)  # Сильный ветер
+
+
+def test_score_stays_in_range():
+    temperatures = np.linspace(-50, 50, 101, dtype=np.float32)
+    scores = comfort_index(temperatures, np.full(101, 100, np.float32), np.full(101, 80, np.float32),
+                           np.full(101, 20, np.float32), np.full(101, 100, np.float32))
+    assert scores.min() >= 1 and scores.max() <= 10
+
+
+def test_missing_data():
+    assert math.isnan(score(float("nan"), 50, 5, 0, 0))
+    assert format_comfort(current_comfort(make_current(temperature_2m=float("nan")))) == "--"
+    assert comfort_to_json(current_comfort(make_current(temperature_2m=float("nan")))) is None
+    assert comfort_to_json(current_comfort(make_current())) == 10.0
+
+
+def test_conditions_changed():
+    assert not conditions_changed(make_current(), make_current(temperature_2m=21.5, apparent_temperature=22.0))
+    assert conditions_changed(make_current(), make_current(precipitation=1.0))
+    assert conditions_changed(make_current(), make_current(temperature_2m=5.0, apparent_temperature=2.0))
+    assert conditions_changed(make_current(), make_current(apparent_temperature=float("nan")))
@@ -0,0 +1,39 @@
+"""Модель прогноза Forecast и ее перевод в JSON."""
+import json
+import math
+import numpy as np
+from weather_core import Forecast, ForecastSeries
+
+
+def make_forecast():
+    daily = ForecastSeries(
+        np.array(["2024-01-01", "2024-01-02"], dtype="datetime64[s]"),
+        {
+            "temperature_2m_max": np.array([1.5, np.nan], dtype=np.float32),
+            "sunrise": np.array(["2024-01-01T08:57", "NaT"], dtype="datetime64[s]")
+        },
+        "D"
+    )
+    hourly = ForecastSeries(
+        np.array(["2024-01-01T00:00", "2024-01-01T01:00"], dtype="datetime64[s]"),
+        {"temperature_2m": np.array([np.nan, -2.0], dtype=np.float32)},
+        "m"
+    )
+    return Forecast(55.7558, 37.6173, 10800, {"temperature_2m": math.nan, "precipitation": 0.0}, daily, hourly)
+
+
+def test_missing_values_become_null():
+    data = make_forecast().to_dict()
+    text = json.dumps(data, allow_nan=False)  # Строгий JSON: без NaN
+    assert json.loads(text)["daily"]["temperature_2m_max"] == [1.5, None]
+    assert data["daily"]["sunrise"] == ["2024-01-01T08:57", None]
+    assert data["hourly"]["temperature_2m"] == [None, -2.0]
+    assert data["current"] == {"temperature_2m": None, "precipitation": 0.0}
+
+
+def test_round_trip_keeps_missing_values():
+    forecast = Forecast.from_dict(json.loads(json.dumps(make_forecast().to_dict())))
+    assert math.isnan(forecast.current["temperature_2m"])
+    assert np.isnan(forecast.daily["temperature_2m_max"][1])
+    assert np.isnat(forecast.daily["sunrise"][1])
+    assert forecast.hourly["temperature_2m"][1] == -2.0
@@ -0,0 +1,107 @@
+"""Встроенный справочник городов и подсказки."""
+import numpy as np
+from weather_places import Place, Gazetteer, CityIndex, build_gazetteer, distance_km, russian_name, suggestion_names
+
+PLACES = [
+    Place("Москва", "RU", 13010112, 55.7558, 37.6173, ("Moscow",)),
+    Place("Брест", "BY", 340000, 52.0976, 23.7341),
+    Place("Брест", "FR", 139000, 48.3904, -4.4861, ("Brest",)),
+    Place("Париж", "FR", 2148000, 48.8566, 2.3522, ("Paris",)),
+    Place("Houston", "US", 2296224, 29.7633, -95.3633, ("Хюстън", "Хьюстон")),
+    Place("Новосибирск", "RU", 1633595, 55.0302, 82.9204, ("Novosibirsk",)),
+    Place("Восточный", "RU", 20000, 65.0, 179.95),
+    Place("Западный", "RU", 20000, 65.0, -179.9),
+    Place("Деревня", "RU", 500, 55.0, 37.0),  # Меньше MIN_POPULATION
+]
+
+
+def make_gazetteer(places=PLACES):
+    return Gazetteer(*build_gazetteer(places))
+
+
+def make_index(places=PLACES):
+    return CityIndex(places, suggestion_names(places), make_gazetteer(places).lookup)
+
+
+def test_lookup_by_name_and_alternate_name():
+    gazetteer = make_gazetteer()
+    assert gazetteer.lookup("москва").name == "Москва"
+    assert gazetteer.lookup("Moscow").name == "Москва"
+    assert gazetteer.lookup("Paris").country == "FR"
+    assert gazetteer.lookup("Лондон") is None
+
+
+def test_lookup_prefers_larger_city():
+    gazetteer = make_gazetteer()
+    assert gazetteer.lookup("Брест").country == "BY"
+    # "Brest" - и другое название французского Бреста, и транслитерация белорусского
+    assert gazetteer.lookup("Brest").country == "BY"
+
+
+def test_small_towns_are_skipped():
+    assert make_gazetteer().lookup("Деревня") is None
+
+
+def test_nearest_across_antimeridian():
+    gazetteer = make_gazetteer()
+    place, distance = gazetteer.nearest(65.0, -179.99)
+    assert place.name == "Восточный" and distance < 5
+    place, distance = gazetteer.nearest(65.0, 179.99)
+    assert place.name == "Восточный"
+    place, distance = gazetteer.nearest(65.0, -179.85)
+    assert place.name == "Западный"
+
+
+def test_nearest_distance_cutoff():
+    gazetteer = make_gazetteer()
+    assert gazetteer.nearest(0.0, 0.0) is None
+    # Москва в 0.5° широты (около 56 км) от точки
+    assert gazetteer.nearest(55.2558, 37.6173) is None
+    place, distance = gazetteer.nearest(55.2558, 37.6173, max_distance_km=60)
+    assert place.name == "Москва" and 55 < distance < 57
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(1)
+    places = [Place(f"Город {i}", "RU", 20000 + i, float(lat), float(lon))
+              for i, (lat, lon) in enumerate(zip(rng.uniform(-80, 80, 400), rng.uniform(-180, 180, 400)))]
+    gazetteer = make_gazetteer(places)
+    latitudes, longitudes = gazetteer.cities["latitude"], gazetteer.cities["longitude"]
+    for latitude, longitude in zip(rng.uniform(-80, 80, 300), rng.uniform(-180, 180, 300)):
+        distances = distance_km(latitude, longitude, latitudes, longitudes)
+        found = gazetteer.nearest(latitude, longitude, max_distance_km=500)
+        if distances.min() > 500:
+            assert found is None
+        else:
+            assert abs(found[1] - distances.min()) < 1e-6
+
+
+def test_search_by_prefix_typo_and_alternate_name():
+    index = make_index()
+    assert [place.name for place in index.search("Мос")] == ["Москва"]
+    assert index.search("Масква")[0].name == "Москва"
+    assert index.search("Par")[0].name == "Париж"
+    assert index.search("Хью")[0].name == "Houston"
+
+
+def test_search_puts_history_first_without_duplicates():
+    index = make_index()
+    suggestions = index.search("Бр", history=["Брест"])
+    assert [(place.name, place.country) for place in suggestions] == [("Брест", "BY")]
+    assert [place.label() for place in index.search("Pa", history=["Paris"])] == ["Париж, FR"]
+
+
+def test_search_finds_typos():
+    index = make_index()
+    assert index.search("новсиб")[0].name == "Новосибирск"  # Пропущена буква
+    assert index.search("Новосибриск")[0].name == "Новосибирск"  # Переставлены буквы
+    assert index.search("Мсоква")[0].name == "Москва"
+    assert index.search("Novosibrisk")[0].name == "Новосибирск"
+    assert index.search("Лондон") == []
+
+
+def test_russian_name_of_russian_city():
+    assert russian_name("Kolomna", ["Коломна", "Коломьна", "Kolomna"]) == "Коломна"
+    assert russian_name("Krasnoarmeysk", ["Красноармейськ", "Красноармейск"]) == "Красноармейск"
+    assert russian_name("Yekaterinburg", ["Екацярынбург", "Екатеринбург"]) == "Екатеринбург"
+    assert russian_name("Moskva", ["Москъва"]) is None
@@ -0,0 +1,100 @@
+"""Общий кэш HTTP-сервиса: объединение одинаковых запросов."""
+import time
+import asyncio
+import pytest
+import weather_core
+import weather_server
+from weather_server import WeatherService, NOT_FOUND_TTL
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_identical_requests_are_computed_once():
+    service = WeatherService(workers=1)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ответ"
+
+    async def main():
+        results = await asyncio.gather(*[service.single_flight("key", compute) for _ in range(20)])
+        # Следующий запрос берется из памяти
+        results.append(await service.single_flight("key", compute))
+        return results
+
+    try:
+        assert run(main()) == ["ответ"] * 21
+        assert len(calls) == 1
+        assert not service.inflight
+    finally:
+        service.close()
+
+
+def test_different_keys_are_computed_separately():
+    service = WeatherService(workers=1)
+
+    async def main():
+        async def compute(value):
+            await asyncio.sleep(0.01)
+            return value
+        return await asyncio.gather(service.single_flight("a", lambda: compute(1)), service.single_flight("b", lambda: compute(2)))
+
+    try:
+        assert run(main()) == [1, 2]
+    finally:
+        service.close()
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    service = WeatherService(workers=1)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("сбой")
+
+    async def main():
+        results = await asyncio.gather(*[service.single_flight("key", failing) for _ in range(5)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        with pytest.raises(ValueError):
+            await service.single_flight("key", failing)
+
+    try:
+        run(main())
+        assert len(calls) == 2  # Ошибка не сохраняется: второй запрос считается заново
+        assert "key" not in service.memory
+    finally:
+        service.close()
+
+
+def test_unknown_city_is_remembered(monkeypatch):
+    service = WeatherService(workers=1)
+    calls = []
+
+    def get_coordinates(city_name):
+        calls.append(city_name)
+        raise weather_core.CityNotFoundError(f"Город {city_name} не найден")
+
+    monkeypatch.setattr(weather_core, "get_local_coordinates", lambda city_name: None)
+    monkeypatch.setattr(weather_core, "get_coordinates", get_coordinates)
+
+    async def main():
+        for city_name in ("Мосвка", "мосвка", "Мосвка"):
+            with pytest.raises(weather_core.CityNotFoundError):
+                await service.get_coordinates(city_name)
+
+    try:
+        run(main())
+        assert calls == ["Мосвка"]  # Повторные запросы не доходят до Nominatim
+        now = time.time()
+        monkeypatch.setattr(weather_server.time, "time", lambda: now + NOT_FOUND_TTL + 1)
+        with pytest.raises(weather_core.CityNotFoundError):
+            run(service.get_coordinates("Мосвка"))
+        assert len(calls) == 2
+    finally:
+        service.close()
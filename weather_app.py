@@ -0,0 +1,1357 @@
+"""Окно приложения AI Weather. Запуск: python AI_Weather.py"""
+import time
+import os
+import sys
+import json
+import queue
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import weather_core
+from weather_core import (
+    SETTINGS_PATH, MAX_FORECAST_DAYS, normalize_city_name, get_coordinates, fetch_forecasts, get_forecast,
+    format_number, get_wind_direction, calculate_daylight_duration, get_weathercode_description, format_current_weather,
+    get_comfort_score, stream_recommendation, timed_import, import_report,
+    save_last_forecast, save_last_answer, load_last_forecast, remember_coordinates, CityNotFoundError
+)
+import weather_metrics
+from weather_comfort import current_comfort, daily_comfort, hourly_comfort, conditions_changed, format_comfort
+from weather_metrics import span, timed
+from weather_places import get_city_index, SUGGESTION_LIMIT
+from weather_charts import ChartPanel, ImageChartPanel, DAILY_CHARTS, HOURLY_CHARTS, close_render_pool
+# matplotlib и клиенты OpenMeteo/GigaChat/Nominatim загружаются позже: при первом
+# использовании или в фоновом потоке после появления окна
+ctk = timed_import("customtkinter")
+
+# Окно должно стать интерактивным за это время (см. python AI_Weather.py --startup-report)
+STARTUP_BUDGET_MS = 500
+
+# Прогнозы из общего запроса по списку городов используем при открытии города 10 минут
+WATCHLIST_MAX_AGE = 600
+AUTOCOMPLETE_DELAY_MS = 150  # Подсказки ищем, когда пользователь перестал печатать
+CITY_HISTORY_SIZE = 20  # Сколько введенных городов запоминать для подсказок
+
+# Фоновая загрузка данных
+BACKGROUND_WORKERS = 4
+UI_POLL_MS = 16  # Как часто главный поток забирает результаты фоновых задач (~60 кадров/с)
+METRICS_REFRESH_MS = 1000  # Как часто обновляется панель замеров в настройках
+METRICS_RECENT_SPANS = 20
+METRICS_JSONL_PATH = os.path.join(weather_core.CACHE_DIR, "metrics.jsonl")
+METRICS_PROMETHEUS_PATH = os.path.join(weather_core.CACHE_DIR, "metrics.prom")
+
+# Почасовой список: высота строки и шаг прокрутки колесом мыши
+HOURLY_ROW_HEIGHT = 170
+SCROLL_STEP = 60
+
+class VirtualList(ctk.CTkFrame):
+    """Прокручиваемый список, который создает виджеты только для видимых строк.
+
+    Строки одинаковой высоты переиспользуются: при прокрутке у них меняется только текст.
+    make_row(parent) создает виджет строки, bind_row(row, index) заполняет его данными.
+    """
+
+    def __init__(self, master, row_height, make_row, bind_row, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.count = 0
+        self.top = 0  # Смещение прокрутки в пикселях
+        self.rows = []
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.viewport.bind("<Configure>", lambda event: self.refresh())
+        self.bind_scroll(self.viewport)
+
+    def bind_scroll(self, widget):
+        """Привязывает прокрутку колесом мыши к виджету."""
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", self.on_mousewheel)
+        widget.bind("<Button-5>", self.on_mousewheel)
+
+    def set_count(self, count):
+        """Задает число строк и перерисовывает видимые строки с начала списка."""
+        self.count = count
+        self.top = 0
+        for row in self.rows:
+            row.bound_index = None
+        self.refresh()
+
+    def viewport_height(self):
+        """Высота видимой области в единицах CTk (без учета масштабирования)."""
+        return self.viewport.winfo_height() / self._get_widget_scaling()
+
+    def refresh(self):
+        """Расставляет строки под текущую позицию прокрутки."""
+        height = self.viewport_height()
+        total = self.count * self.row_height
+        self.top = max(0, min(self.top, total - height))
+
+        # Создаем ровно столько строк, сколько помещается в окно (плюс одна частично видимая)
+        visible = int(height // self.row_height) + 2
+        while len(self.rows) < visible:
+            row = self.make_row(self.viewport)
+            row.bound_index = None
+            self.bind_scroll(row)
+            for child in row.winfo_children():
+                self.bind_scroll(child)
+            self.rows.append(row)
+
+        first = int(self.top // self.row_height)
+        offset = self.top - first * self.row_height
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if i < visible and index < self.count:
+                if row.bound_index != index:
+                    self.bind_row(row, index)
+                    row.bound_index = index
+                row.place(x=0, y=i * self.row_height - offset, relwidth=1)
+            else:
+                row.place_forget()
+
+        if total > 0:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Обрабатывает команды полосы прокрутки ("moveto" и "scroll")."""
+        total = self.count * self.row_height
+        if args[0] == "moveto":
+            self.top = float(args[1]) * total
+        elif args[0] == "scroll":
+            step = self.viewport_height() if args[2] == "pages" else SCROLL_STEP
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def on_mousewheel(self, event):
+        """Прокручивает список колесом мыши (Windows, macOS и Linux)."""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.yview("scroll", -1, "units")
+        else:
+            self.yview("scroll", 1, "units")
+
+
+
+class WeatherApp:
+    def __init__(self, root, start_time, startup_report=False):
+        self.root = root
+        self.start_time = start_time  # Время запуска программы (time.perf_counter) для замера
+        self.startup_report = startup_report  # Напечатать отчет о запуске и выйти
+        self.startup_ms = None
+        self.root.geometry("1300x700")
+        self.root.title("AI Weather")
+        self.current_city = ""
+        self.last_city = ""  # Город из прошлого запуска, открывается сразу
+        self.city_history = []  # Недавно выбранные города, от новых к старым
+        self.suggestions_after_id = None
+        self.forecast_days = 7  # По умолчанию прогноз на 7 дней
+        self.theme = "system"  # По умолчанию системная тема
+        self.chart_processes = False  # Отрисовка графиков в пуле процессов вместо главного потока
+        self.weather_data = None  # Последний прогноз (Forecast) для текущего города
+        self.data_city = None  # Ключ города, к которому относятся weather_data и hourly_data
+        # Время получения сохраненного прогноза, который показан до обновления (None - данные свежие)
+        self.stale_time = None
+        self.stale_answers = {}  # Сохраненные ответы нейросети, подходящие к показанному прогнозу
+        self.saved_answers = {}  # Сохраненные ответы: kind -> (текст, погода, для которой он получен)
+        self.hourly_comfort = None  # Локальные оценки комфорта по часам для строк почасового прогноза
+        self.hourly_data = None  # Для хранения  данных
+        self.watchlist = []  # Список отслеживаемых городов
+        self.watchlist_forecasts = {}  # Ключ города -> (прогноз на MAX_FORECAST_DAYS дней, время загрузки)
+        self.watchlist_rows = {}
+        # Сеть и нейросеть работают в фоновых потоках, виджеты обновляются только из главного
+        self.executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS)
+        self.ui_queue = queue.Queue()
+        self.request_id = 0  # Номер последнего запроса, ответы на старые запросы отбрасываются
+        # Номер запроса к нейросети: меняется только при выборе города, а не при смене срока прогноза
+        self.answer_id = 0
+        # Вкладки прогноза отрисовываются только при показе, если их данные изменились
+        self.visible_tab = None
+        self.dirty_tabs = set()
+        self.load_settings()  # Загружаем настройки
+        self.setup_ui()
+        if self.last_city:
+            self.open_city(self.last_city)
+        self.root.after(UI_POLL_MS, self.process_ui_queue)
+        # Когда окно отрисовано, замеряем время запуска и прогреваем тяжелые модули в фоне
+        self.root.after_idle(self.on_window_ready)
+
+    def load_settings(self):
+        """Загружает настройки из файла, если он существует."""
+        if os.path.exists(SETTINGS_PATH):
+            with open(SETTINGS_PATH, "r") as f:
+                settings = json.load(f)
+                self.forecast_days = settings.get("forecast_days", 7)
+                self.theme = settings.get("theme", "system")
+                self.watchlist = settings.get("watchlist", [])
+                self.last_city = settings.get("last_city", "")
+                self.city_history = settings.get("city_history", [])
+                self.chart_processes = settings.get("chart_processes", False)
+                ctk.set_appearance_mode(self.theme)
+
+    def save_settings(self):
+        """Сохраняет текущие настройки в файл."""
+        settings = {
+            "forecast_days": self.forecast_days,
+            "theme": self.theme,
+            "watchlist": self.watchlist,
+            "last_city": self.current_city or self.last_city,
+            "city_history": self.city_history,
+            "chart_processes": self.chart_processes
+        }
+        with open(SETTINGS_PATH, "w") as f:
+            json.dump(settings, f)
+
+    @timed("ui.setup")
+    def setup_ui(self):
+        """Настройка пользовательского интерфейса."""
+        self.root.grid_rowconfigure(1, weight=1)
+        self.root.grid_columnconfigure(1, weight=1)
+
+        # Боковая панель для вкладок
+        self.sidebar = ctk.CTkFrame(self.root, width=200, corner_radius=0)
+        self.sidebar.grid(row=0, column=0, rowspan=2, sticky="nswe")
+        self.sidebar.grid_rowconfigure(6, weight=1)
+
+        # Кнопка для перехода на вкладку "Город"
+        self.button_city = ctk.CTkButton(
+            self.sidebar,
+            text="Город",
+            command=lambda: self.show_tab("Город"),
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_city.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+
+        # Для группировки вкладок, связанных с погодой
+        self.weather_tabs_frame = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        self.weather_tabs_frame.grid(row=1, column=0, padx=10, pady=10, sticky="ew")
+
+        # Кнопка для раскрытия/сворачивания вкладок погоды
+        self.button_weather_group = ctk.CTkButton(
+            self.weather_tabs_frame,
+            text="Погода ▼",
+            command=self.toggle_weather_tabs,
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_weather_group.pack(fill="x", pady=(0, 5))
+
+        # Кнопки для переключения между вкладками погоды 
+        self.button_weather = ctk.CTkButton(
+            self.weather_tabs_frame,
+            text="Текущая погода",
+            command=lambda: self.show_tab("Погода"),
+            font=("Arial", 14, "bold"),
+            state="disabled",
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_forecast = ctk.CTkButton(
+            self.weather_tabs_frame,
+            text=f"Прогноз на {self.forecast_days} дней",
+            command=lambda: self.show_tab("Прогноз на 7 дней"),
+            font=("Arial", 14, "bold"),
+            state="disabled",
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_hourly = ctk.CTkButton(
+            self.weather_tabs_frame,
+            text="Почасовой прогноз",
+            command=lambda: self.show_tab("Почасовые Погодные Переменные"),
+            font=("Arial", 14, "bold"),
+            state="disabled",
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+
+        # Кнопка для перехода на вкладку "Настройки"
+        self.button_settings = ctk.CTkButton(
+            self.sidebar,
+            text="Настройки",
+            command=lambda: self.show_tab("Настройки"),
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_settings.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
+
+        # Кнопка для перехода на вкладку "Список городов"
+        self.button_watchlist = ctk.CTkButton(
+            self.sidebar,
+            text="Список городов",
+            command=lambda: self.show_tab("Список городов"),
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=180,
+            height=40
+        )
+        self.button_watchlist.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+
+        # Вкладка "Город"
+        self.frame_city = ctk.CTkFrame(self.root)
+        self.frame_city.grid(row=1, column=1, sticky="nsew")
+        self.frame_city.grid_rowconfigure(0, weight=1)
+        self.frame_city.grid_columnconfigure(0, weight=1)
+
+        self.scrollable_frame_city = ctk.CTkScrollableFrame(self.frame_city)
+        self.scrollable_frame_city.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        self.scrollable_frame_city.grid_rowconfigure(0, weight=1)
+        self.scrollable_frame_city.grid_columnconfigure(0, weight=1)
+
+        self.label_title_city = ctk.CTkLabel(self.scrollable_frame_city, text="Введите город", font=("Arial", 24, "bold"))
+        self.label_title_city.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+        # Поле для ввода города
+        self.city_name_entry = ctk.CTkEntry(self.scrollable_frame_city, placeholder_text="Введите название города", font=("Arial", 16))
+        self.city_name_entry.grid(row=1, column=0, padx=10, pady=10, sticky="ew")
+
+        # Подсказки городов под полем ввода: кнопки создаются один раз и переиспользуются
+        self.frame_suggestions = ctk.CTkFrame(self.scrollable_frame_city, fg_color="transparent")
+        self.frame_suggestions.grid_columnconfigure(0, weight=1)
+        self.suggestion_buttons = []
+        for i in range(SUGGESTION_LIMIT):
+            button = ctk.CTkButton(self.frame_suggestions, text="", font=("Arial", 14), anchor="w", fg_color="transparent",
+                                   text_color=("gray10", "gray90"), hover_color=("gray75", "gray30"), height=28)
+            self.suggestion_buttons.append(button)
+
+        # Кнопка "Установить город" (изначально неактивна)
+        self.button_set_city = ctk.CTkButton(
+            self.scrollable_frame_city,
+            text="Установить город",
+            command=self.set_city,
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=200,
+            height=40,
+            state="disabled"  # Кнопка изначально неактивна
+        )
+        self.button_set_city.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
+
+        # Сообщение о необходимости ввода города
+        self.label_city_message = ctk.CTkLabel(
+            self.scrollable_frame_city,
+            text="Пожалуйста, введите город, чтобы получить доступ к другим вкладкам.",
+            font=("Arial", 14),
+            text_color="gray"
+        )
+        self.label_city_message.grid(row=4, column=0, padx=10, pady=10, sticky="w")
+
+        # Привязка события к полю ввода города
+        self.city_name_entry.bind("<KeyRelease>", self.on_city_key_release)
+
+        # Вкладка "Погода"
+        self.frame_weather = ctk.CTkFrame(self.root)
+        self.frame_weather.grid(row=1, column=1, sticky="nsew")
+        self.frame_weather.grid_rowconfigure(0, weight=1)
+        self.frame_weather.grid_columnconfigure(0, weight=1)
+
+        self.scrollable_frame_weather = ctk.CTkScrollableFrame(self.frame_weather)
+        self.scrollable_frame_weather.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        self.scrollable_frame_weather.grid_rowconfigure(0, weight=1)
+        self.scrollable_frame_weather.grid_columnconfigure(0, weight=1)
+
+        self.label_title_weather = ctk.CTkLabel(self.scrollable_frame_weather, text="Текущая погода", font=("Arial", 24, "bold"))
+        self.label_title_weather.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+        self.label_loading_weather = ctk.CTkLabel(self.scrollable_frame_weather, text="⏳ Загрузка...", font=("Arial", 14), text_color="gray")
+
+        # Фрейм для отображения текущей погоды
+        self.frame_current_weather = ctk.CTkFrame(self.scrollable_frame_weather, corner_radius=10)
+        self.frame_current_weather.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.label_temperature = ctk.CTkLabel(self.frame_current_weather, text="🌡️ Текущая температура: --°C", font=("Arial", 16, "bold"))
+        self.label_temperature.pack(padx=10, pady=5, anchor="w")
+
+        self.label_feels_like = ctk.CTkLabel(self.frame_current_weather, text="🌡️ Температура по ощущениям: --°C", font=("Arial", 16, "bold"))
+        self.label_feels_like.pack(padx=10, pady=5, anchor="w")
+
+        self.label_humidity = ctk.CTkLabel(self.frame_current_weather, text="💧 Относительная влажность: --%", font=("Arial", 16, "bold"))
+        self.label_humidity.pack(padx=10, pady=5, anchor="w")
+
+        self.label_precipitation = ctk.CTkLabel(self.frame_current_weather, text="🌧️ Текущие осадки: -- мм", font=("Arial", 16, "bold"))
+        self.label_precipitation.pack(padx=10, pady=5, anchor="w")
+
+        self.label_wind = ctk.CTkLabel(self.frame_current_weather, text="💨 Скорость ветра: -- м/с", font=("Arial", 16, "bold"))
+        self.label_wind.pack(padx=10, pady=5, anchor="w")
+
+        self.label_wind_direction = ctk.CTkLabel(self.frame_current_weather, text="🧭 Направление ветра: --", font=("Arial", 16, "bold"))
+        self.label_wind_direction.pack(padx=10, pady=5, anchor="w")
+
+        self.label_cloudcover = ctk.CTkLabel(self.frame_current_weather, text="☁️ Общий уровень облачности: --%", font=("Arial", 16, "bold"))
+        self.label_cloudcover.pack(padx=10, pady=5, anchor="w")
+
+        self.label_weathercode = ctk.CTkLabel(self.frame_current_weather, text="🌤️ Погодный код: --", font=("Arial", 16, "bold"))
+        self.label_weathercode.pack(padx=10, pady=5, anchor="w")
+
+        # Локальная оценка комфорта (считается сразу, без сети) и оценка от нейросети
+        self.label_comfort_local = ctk.CTkLabel(self.frame_current_weather, text="🧮 Индекс комфорта: --/10", font=("Arial", 16, "bold"))
+        self.label_comfort_local.pack(padx=10, pady=5, anchor="w")
+
+        self.label_comfort = ctk.CTkLabel(self.frame_current_weather, text="🌟 Оценка комфорта: --/10", font=("Arial", 16, "bold"))
+        self.label_comfort.pack(padx=10, pady=5, anchor="w")
+
+        # Фрейм для рекомендации от AI
+        self.frame_recommendation = ctk.CTkFrame(self.scrollable_frame_weather, corner_radius=10)
+        self.frame_recommendation.grid(row=2, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.label_recommendation = ctk.CTkLabel(self.frame_recommendation, text="Рекомендация от Нейросети: --", font=("Arial", 16, "bold"), wraplength=700)
+        self.label_recommendation.pack(padx=10, pady=10, anchor="w")
+
+        # Вкладка "Прогноз на 7 дней"
+        self.frame_forecast_tab = ctk.CTkFrame(self.root)
+        self.frame_forecast_tab.grid(row=1, column=1, sticky="nsew")
+        self.frame_forecast_tab.grid_rowconfigure(1, weight=1)
+        self.frame_forecast_tab.grid_columnconfigure(0, weight=1)
+
+        self.label_title_7_days = ctk.CTkLabel(self.frame_forecast_tab, text=f"Прогноз на {self.forecast_days} дней", font=("Arial", 24, "bold"))
+        self.label_title_7_days.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+
+        self.label_loading_forecast = ctk.CTkLabel(self.frame_forecast_tab, text="⏳ Загрузка...", font=("Arial", 14), text_color="gray")
+
+        self.frame_forecast_and_chart = ctk.CTkFrame(self.frame_forecast_tab)
+        self.frame_forecast_and_chart.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        self.frame_forecast_and_chart.grid_rowconfigure(0, weight=1)
+        self.frame_forecast_and_chart.grid_columnconfigure(0, weight=1)
+        self.frame_forecast_and_chart.grid_columnconfigure(1, weight=1)
+
+        self.frame_forecast = ctk.CTkScrollableFrame(self.frame_forecast_and_chart, height=200)
+        self.frame_forecast.grid(row=0, column=0, padx=10, pady=5, sticky="nsew")
+
+        self.frame_chart = ctk.CTkScrollableFrame(self.frame_forecast_and_chart)
+        self.frame_chart.grid(row=0, column=1, padx=10, pady=5, sticky="nsew")
+
+        # Вкладка "Почасовой прогноз"
+        self.frame_hourly_tab = ctk.CTkFrame(self.root)
+        self.frame_hourly_tab.grid(row=1, column=1, sticky="nsew")
+        self.frame_hourly_tab.grid_rowconfigure(1, weight=1)
+        self.frame_hourly_tab.grid_columnconfigure(0, weight=1)
+
+        self.label_title_hourly = ctk.CTkLabel(self.frame_hourly_tab, text="Почасовой Прогноз", font=("Arial", 24, "bold"))
+        self.label_title_hourly.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+
+        self.label_loading_hourly = ctk.CTkLabel(self.frame_hourly_tab, text="⏳ Загрузка...", font=("Arial", 14), text_color="gray")
+
+        self.frame_hourly_and_chart = ctk.CTkFrame(self.frame_hourly_tab)
+        self.frame_hourly_and_chart.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        self.frame_hourly_and_chart.grid_rowconfigure(0, weight=1)
+        self.frame_hourly_and_chart.grid_columnconfigure(0, weight=1)
+        self.frame_hourly_and_chart.grid_columnconfigure(1, weight=1)
+
+        self.frame_hourly = VirtualList(self.frame_hourly_and_chart, HOURLY_ROW_HEIGHT, self.make_hourly_row, self.bind_hourly_row, height=200)
+        self.frame_hourly.grid(row=0, column=0, padx=10, pady=5, sticky="nsew")
+
+        self.frame_hourly_chart = ctk.CTkScrollableFrame(self.frame_hourly_and_chart)
+        self.frame_hourly_chart.grid(row=0, column=1, padx=10, pady=5, sticky="nsew")
+        self.create_chart_panels()
+
+        # Вкладка "Список городов"
+        self.frame_watchlist = ctk.CTkFrame(self.root)
+        self.frame_watchlist.grid(row=1, column=1, sticky="nsew")
+        self.frame_watchlist.grid_rowconfigure(2, weight=1)
+        self.frame_watchlist.grid_columnconfigure(0, weight=1)
+
+        self.label_title_watchlist = ctk.CTkLabel(self.frame_watchlist, text="Список городов", font=("Arial", 24, "bold"))
+        self.label_title_watchlist.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+
+        self.label_loading_watchlist = ctk.CTkLabel(self.frame_watchlist, text="⏳ Загрузка...", font=("Arial", 14), text_color="gray")
+
+        self.frame_watchlist_controls = ctk.CTkFrame(self.frame_watchlist, fg_color="transparent")
+        self.frame_watchlist_controls.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        self.frame_watchlist_controls.grid_columnconfigure(0, weight=1)
+
+        self.watchlist_entry = ctk.CTkEntry(self.frame_watchlist_controls, placeholder_text="Добавить город в список", font=("Arial", 16))
+        self.watchlist_entry.grid(row=0, column=0, padx=(0, 10), pady=5, sticky="ew")
+        self.watchlist_entry.bind("<Return>", lambda event: self.add_to_watchlist())
+
+        self.button_watchlist_add = ctk.CTkButton(
+            self.frame_watchlist_controls,
+            text="Добавить",
+            command=self.add_to_watchlist,
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=120,
+            height=40
+        )
+        self.button_watchlist_add.grid(row=0, column=1, padx=(0, 10), pady=5)
+
+        self.button_watchlist_refresh = ctk.CTkButton(
+            self.frame_watchlist_controls,
+            text="Обновить все",
+            command=lambda: self.refresh_watchlist(refresh=True),
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10,
+            width=150,
+            height=40
+        )
+        self.button_watchlist_refresh.grid(row=0, column=2, pady=5)
+
+        self.frame_watchlist_rows = ctk.CTkScrollableFrame(self.frame_watchlist)
+        self.frame_watchlist_rows.grid(row=2, column=0, padx=10, pady=5, sticky="nsew")
+        self.frame_watchlist_rows.grid_columnconfigure(0, weight=1)
+        self.build_watchlist_rows()
+
+        # Вкладка "Настройки"
+        self.frame_settings = ctk.CTkFrame(self.root)
+        self.frame_settings.grid(row=1, column=1, sticky="nsew")
+        self.frame_settings.grid_rowconfigure(0, weight=1)
+        self.frame_settings.grid_columnconfigure(0, weight=1)
+
+        self.scrollable_frame_settings = ctk.CTkScrollableFrame(self.frame_settings)
+        self.scrollable_frame_settings.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        self.scrollable_frame_settings.grid_rowconfigure(0, weight=1)
+        self.scrollable_frame_settings.grid_columnconfigure(0, weight=1)
+
+        self.label_title_settings = ctk.CTkLabel(self.scrollable_frame_settings, text="Настройки", font=("Arial", 24, "bold"))
+        self.label_title_settings.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+        self.label_theme = ctk.CTkLabel(self.scrollable_frame_settings, text="Тема:", font=("Arial", 16, "bold"))
+        self.label_theme.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+
+        self.theme_var = ctk.StringVar(value=self.theme)  # По умолчанию системная тема
+        self.optionmenu_theme = ctk.CTkOptionMenu(
+            self.scrollable_frame_settings,
+            values=["system", "light", "dark"],
+            command=self.change_theme,
+            variable=self.theme_var,
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            button_color="#4CAF50",
+            button_hover_color="#45a049",
+            text_color="white"
+        )
+        self.optionmenu_theme.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+
+        # Добавляем выбор длительности прогноза
+        self.label_forecast_days = ctk.CTkLabel(self.scrollable_frame_settings, text="Длительность прогноза:", font=("Arial", 16, "bold"))
+        self.label_forecast_days.grid(row=2, column=0, padx=10, pady=10, sticky="w")
+
+        self.forecast_days_var = ctk.StringVar(value=str(self.forecast_days))  # По умолчанию 7 дней
+        self.optionmenu_forecast_days = ctk.CTkOptionMenu(
+            self.scrollable_frame_settings,
+            values=["7", "10", "16"],
+            command=self.change_forecast_days,
+            variable=self.forecast_days_var,
+            font=("Arial", 16, "bold"),
+            fg_color="#4CAF50",
+            button_color="#4CAF50",
+            button_hover_color="#45a049",
+            text_color="white"
+        )
+        self.optionmenu_forecast_days.grid(row=2, column=1, padx=10, pady=10, sticky="ew")
+
+        self.label_startup_time = ctk.CTkLabel(self.scrollable_frame_settings, text="Время запуска: --", font=("Arial", 14), text_color="gray")
+        self.label_startup_time.grid(row=3, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+
+        # Панель замеров производительности (скрыта, пока не включен переключатель)
+        self.switch_metrics = ctk.CTkSwitch(self.scrollable_frame_settings, text="Замеры производительности", font=("Arial", 16, "bold"), command=self.toggle_metrics_overlay)
+        self.switch_metrics.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+
+        self.switch_chart_processes = ctk.CTkSwitch(self.scrollable_frame_settings, text="Отрисовка графиков в фоновых процессах", font=("Arial", 16, "bold"), command=self.toggle_chart_processes)
+        self.switch_chart_processes.grid(row=6, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+        if self.chart_processes:
+            self.switch_chart_processes.select()
+
+        self.frame_metrics = ctk.CTkFrame(self.scrollable_frame_settings, corner_radius=10)
+        self.frame_metrics.grid_columnconfigure(2, weight=1)
+        self.textbox_metrics = ctk.CTkTextbox(self.frame_metrics, height=320, font=("Courier New", 13), wrap="none", state="disabled")
+        self.textbox_metrics.grid(row=0, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
+        self.button_export_jsonl = ctk.CTkButton(self.frame_metrics, text="Экспорт JSON lines", command=self.export_metrics_jsonl, fg_color="#4CAF50", hover_color="#45a049")
+        self.button_export_jsonl.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
+        self.button_export_prometheus = ctk.CTkButton(self.frame_metrics, text="Экспорт Prometheus", command=self.export_metrics_prometheus, fg_color="#4CAF50", hover_color="#45a049")
+        self.button_export_prometheus.grid(row=1, column=1, padx=10, pady=(0, 10), sticky="w")
+        self.label_metrics_export = ctk.CTkLabel(self.frame_metrics, text="", font=("Arial", 12), text_color="gray")
+        self.label_metrics_export.grid(row=1, column=2, padx=10, pady=(0, 10), sticky="w")
+        self.metrics_after_id = None
+
+        # Сообщения об ошибках
+        self.label_no_city = ctk.CTkLabel(self.frame_forecast_tab, text="Пожалуйста, введите город для отображения данных.", font=("Arial", 14), text_color="gray")
+        self.label_no_city_hourly = ctk.CTkLabel(self.frame_hourly_tab, text="Пожалуйста, введите город для отображения данных.", font=("Arial", 14), text_color="gray")
+
+        # Показываем вкладку "Город" по умолчанию
+        self.show_tab("Город")
+
+    def on_window_ready(self):
+        """Замеряет время до интерактивного окна и запускает фоновый прогрев."""
+        self.startup_ms = (time.perf_counter() - self.start_time) * 1000
+        status = "в пределах бюджета" if self.startup_ms <= STARTUP_BUDGET_MS else "превышен бюджет"
+        self.label_startup_time.configure(text=f"Время запуска: {self.startup_ms:.0f} мс ({status} {STARTUP_BUDGET_MS} мс)")
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"Запуск занял {self.startup_ms:.0f} мс, бюджет {STARTUP_BUDGET_MS} мс: {import_report()}")
+        self.executor.submit(self.warm_up)
+
+    def warm_up(self):
+        """Фоновая задача: загружает тяжелые модули до первого запроса пользователя."""
+        try:
+            weather_core.warm_up()
+            get_city_index()
+            timed_import("matplotlib.figure")
+            timed_import("matplotlib.backends.backend_agg")
+        except Exception as e:
+            print(f"Ошибка прогрева: {e}")
+        self.call_in_ui(self.on_warm_up_done)
+
+    def on_warm_up_done(self):
+        """Печатает отчет о запуске, если приложение запущено с --startup-report."""
+        if self.startup_report:
+            report = {
+                "startup_ms": round(self.startup_ms),
+                "budget_ms": STARTUP_BUDGET_MS,
+                "imports_ms": {name: round(ms, 1) for name, ms in import_report().items()}
+            }
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+            self.on_closing()
+
+    def toggle_metrics_overlay(self):
+        """Показывает или скрывает панель замеров в настройках."""
+        if self.metrics_after_id:
+            self.root.after_cancel(self.metrics_after_id)
+            self.metrics_after_id = None
+        if self.switch_metrics.get():
+            self.frame_metrics.grid(row=5, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+            self.refresh_metrics_overlay()
+        else:
+            self.frame_metrics.grid_remove()
+
+    def refresh_metrics_overlay(self):
+        """Обновляет сводку замеров, пока панель включена."""
+        lines = [f"{'этап':<22}{'метки':<34}{'число':>7}{'сред, мс':>11}{'макс, мс':>11}"]
+        for name, labels, count, average_ms, max_ms in weather_metrics.summary():
+            label_text = ", ".join(f"{key}={value}" for key, value in labels.items())
+            lines.append(f"{name:<22}{label_text[:33]:<34}{count:>7}{average_ms:>11.1f}{max_ms:>11.1f}")
+        lines.append("")
+        lines.append("Последние замеры:")
+        for item in reversed(weather_metrics.recent_spans(METRICS_RECENT_SPANS)):
+            moment = time.strftime("%H:%M:%S", time.localtime(item["time"]))
+            extra = ", ".join(f"{key}={value}" for key, value in item.items() if key not in ("name", "time", "duration_ms"))
+            lines.append(f"{moment}  {item['name']:<20}{item['duration_ms']:>10.1f} мс  {extra}")
+        self.textbox_metrics.configure(state="normal")
+        self.textbox_metrics.delete("1.0", "end")
+        self.textbox_metrics.insert("1.0", "\n".join(lines))
+        self.textbox_metrics.configure(state="disabled")
+        self.metrics_after_id = self.root.after(METRICS_REFRESH_MS, self.refresh_metrics_overlay)
+
+    def export_metrics_jsonl(self):
+        """Дописывает в файл JSON lines новые замеры (после прошлой выгрузки)."""
+        try:
+            count = weather_metrics.export_jsonl(METRICS_JSONL_PATH)
+            self.label_metrics_export.configure(text=f"{count} замеров записано в {METRICS_JSONL_PATH}")
+        except OSError as e:
+            self.label_metrics_export.configure(text=f"Ошибка экспорта: {e}")
+
+    def export_metrics_prometheus(self):
+        """Сохраняет сводку замеров в текстовом формате Prometheus."""
+        try:
+            with open(METRICS_PROMETHEUS_PATH, "w", encoding="utf-8") as f:
+                f.write(weather_metrics.prometheus_text())
+            self.label_metrics_export.configure(text=f"Сводка сохранена в {METRICS_PROMETHEUS_PATH}")
+        except OSError as e:
+            self.label_metrics_export.configure(text=f"Ошибка экспорта: {e}")
+
+    def toggle_weather_tabs(self):
+        """Раскрывает или сворачивает вкладки, связанные с погодой."""
+        if self.button_weather.winfo_ismapped():
+            self.button_weather.pack_forget()
+            self.button_forecast.pack_forget()
+            self.button_hourly.pack_forget()
+            self.button_weather_group.configure(text="Погода ▶")
+        else:
+            self.button_weather.pack(fill="x", pady=(0, 5))
+            self.button_forecast.pack(fill="x", pady=(0, 5))
+            self.button_hourly.pack(fill="x", pady=(0, 5))
+            self.button_weather_group.configure(text="Погода ▼")
+
+    def change_theme(self, choice):
+        """Изменяет тему приложения."""
+        self.theme = choice
+        ctk.set_appearance_mode(choice)
+        self.save_settings()  # Сохраняем настройки
+
+    def create_chart_panels(self):
+        """Создает панели графиков: в главном потоке или в пуле процессов (картинками)."""
+        if self.chart_processes:
+            self.daily_charts = ImageChartPanel(self.frame_chart, DAILY_CHARTS, self.call_in_ui)
+            self.hourly_charts = ImageChartPanel(self.frame_hourly_chart, HOURLY_CHARTS, self.call_in_ui)
+        else:
+            self.daily_charts = ChartPanel(self.frame_chart, DAILY_CHARTS)
+            self.hourly_charts = ChartPanel(self.frame_hourly_chart, HOURLY_CHARTS)
+
+    def toggle_chart_processes(self):
+        """Переключает способ отрисовки графиков и перерисовывает их."""
+        self.chart_processes = bool(self.switch_chart_processes.get())
+        self.daily_charts.close()
+        self.hourly_charts.close()
+        if not self.chart_processes:
+            close_render_pool()
+        self.create_chart_panels()
+        self.save_settings()
+        if self.weather_data:
+            self.mark_dirty("Прогноз на 7 дней", "Почасовые Погодные Переменные")
+
+    def change_forecast_days(self, choice):
+        """Изменяет длительность прогноза."""
+        self.forecast_days = int(choice)
+        self.button_forecast.configure(text=f"Прогноз на {self.forecast_days} дней")
+        self.label_title_7_days.configure(text=f"Прогноз на {self.forecast_days} дней в городе {self.current_city}")
+        self.save_settings()  # Сохраняем настройки
+        # Прогноз уже загружен на MAX_FORECAST_DAYS дней, новый срок вырезается из него без сети
+        self.update_weather_data(with_ai=False)
+
+    def check_city_input(self, event=None):
+        """Проверяет, есть ли текст в поле ввода города, и активирует/деактивирует кнопку."""
+        if self.city_name_entry.get().strip():
+            self.button_set_city.configure(state="normal")  # Активируем кнопку
+        else:
+            self.button_set_city.configure(state="disabled")  # Деактивируем кнопку
+
+    def on_city_key_release(self, event=None):
+        """Обновляет кнопку и откладывает поиск подсказок до паузы в наборе."""
+        self.check_city_input()
+        if self.suggestions_after_id:
+            self.root.after_cancel(self.suggestions_after_id)
+        self.suggestions_after_id = self.root.after(AUTOCOMPLETE_DELAY_MS, self.show_city_suggestions)
+
+    def show_city_suggestions(self):
+        """Показывает подсказки для введенного текста (поиск по локальному индексу, без сети)."""
+        self.suggestions_after_id = None
+        with span("ui.autocomplete"):
+            places = get_city_index().search(self.city_name_entry.get(), self.city_history + self.watchlist)
+        for i, button in enumerate(self.suggestion_buttons):
+            if i < len(places):
+                button.configure(text=places[i].label(), command=lambda place=places[i]: self.choose_city_suggestion(place))
+                button.grid(row=i, column=0, sticky="ew")
+            else:
+                button.grid_remove()
+        if places:
+            self.frame_suggestions.grid(row=2, column=0, padx=10, pady=(0, 5), sticky="ew")
+        else:
+            self.frame_suggestions.grid_remove()
+
+    def hide_city_suggestions(self):
+        """Скрывает подсказки и отменяет отложенный поиск."""
+        if self.suggestions_after_id:
+            self.root.after_cancel(self.suggestions_after_id)
+            self.suggestions_after_id = None
+        self.frame_suggestions.grid_remove()
+
+    def choose_city_suggestion(self, place):
+        """Открывает город из подсказок. Координаты города из справочника уже известны."""
+        if place.latitude is not None:
+            try:
+                remember_coordinates(place.name, place.latitude, place.longitude)
+            except Exception as e:
+                print(f"Не удалось сохранить координаты: {e}")
+        self.open_city(place.name)
+
+    def set_city(self):
+        """Устанавливает город и активирует кнопки."""
+        city_name = self.city_name_entry.get()
+        if city_name:
+            self.hide_city_suggestions()
+            self.current_city = city_name
+            # Запоминаем город для подсказок: новые в начале, без повторов
+            key = normalize_city_name(city_name)
+            self.city_history = [city_name] + [name for name in self.city_history if normalize_city_name(name) != key]
+            del self.city_history[CITY_HISTORY_SIZE:]
+            self.save_settings()  # Запоминаем город для следующего запуска
+            self.update_weather_data()
+            self.button_weather.configure(state="normal")
+            self.button_forecast.configure(state="normal")
+            self.button_hourly.configure(state="normal")
+            self.label_city_message.grid_remove()
+            self.show_tab("Погода")
+            # Обновляем заголовки вкладок с городом
+            self.label_title_weather.configure(text=f"Текущая погода в городе {self.current_city}")
+            self.label_title_7_days.configure(text=f"Прогноз на {self.forecast_days} дней в городе {self.current_city}")
+            self.label_title_hourly.configure(text=f"Почасовой прогноз в городе {self.current_city}")
+
+    def update_weather_data(self, with_ai=True):
+        """Запускает фоновое обновление данных о погоде и прогнозе."""
+        if self.current_city:
+            self.request_id += 1
+            if with_ai:
+                self.answer_id += 1
+            if normalize_city_name(self.current_city) != self.data_city:
+                # Прогноз прошлого города больше не показываем ни на одной вкладке
+                self.weather_data = None
+                self.hourly_data = None
+                self.data_city = None
+                self.mark_dirty("Прогноз на 7 дней", "Почасовые Погодные Переменные")
+            if with_ai:
+                self.label_comfort.configure(text="🌟 Оценка комфорта от Нейросети: загрузка...")
+                self.label_recommendation.configure(text="Рекомендация от Нейросети: загрузка...")
+                # Сохраненный прогноз читается в фоне и показывается, как только будет прочитан
+                self.stale_time = None
+                self.stale_answers = {}
+                self.saved_answers = {}
+            if self.stale_time:
+                self.set_status(f"⏳ Обновление... (данные {self.format_as_of(self.stale_time)})")
+            else:
+                self.set_status("⏳ Загрузка...")
+            self.executor.submit(self.load_weather_data, self.request_id, self.answer_id, self.current_city, with_ai)
+
+    def show_last_forecast(self, request_id, saved):
+        """Показывает сохраненный прогноз для текущего города, пока идет обновление (в главном потоке)."""
+        if request_id != self.request_id:
+            return
+        forecast, self.saved_answers, self.stale_time = saved
+        # Прогноз сохранен на тот срок, который был выбран тогда; показываем выбранный сейчас
+        forecast = forecast.head(self.forecast_days)
+        # Ответы, полученные для другой погоды, к сохраненному прогнозу не подходят
+        self.stale_answers = {
+            kind: text for kind, (text, current) in self.saved_answers.items()
+            if not conditions_changed(current, forecast.current)
+        }
+        self.weather_data = forecast
+        self.hourly_data = forecast
+        self.data_city = normalize_city_name(self.current_city)
+        self.show_current_weather(forecast.current)
+        if "comfort" in self.stale_answers:
+            self.label_comfort.configure(text=f"🌟 Оценка комфорта от Нейросети: {self.stale_answers['comfort']}/10")
+        if "recommendation" in self.stale_answers:
+            self.label_recommendation.configure(text=f"Рекомендация от Нейросети: {self.stale_answers['recommendation']}")
+        self.set_status(f"⏳ Обновление... (данные {self.format_as_of(self.stale_time)})")
+        self.mark_dirty("Прогноз на 7 дней", "Почасовые Погодные Переменные")
+
+    def format_as_of(self, saved_at):
+        """Подпись "по состоянию на HH:MM" (с датой, если прогноз получен не сегодня)."""
+        saved = time.localtime(saved_at)
+        time_format = "%H:%M" if saved[:3] == time.localtime()[:3] else "%d.%m %H:%M"
+        return f"по состоянию на {time.strftime(time_format, saved)}"
+
+    def load_weather_data(self, request_id, answer_id, city_name, with_ai):
+        """Фоновая задача: загружает прогноз и, если нужно, рекомендации нейросети.
+
+        Вместе с рекомендациями сначала читается сохраненный прогноз. Если погода, для которой
+        получены сохраненные ответы нейросети (previous), почти не отличается от новой,
+        нейросеть не спрашиваем.
+        """
+        previous = None
+        if with_ai:
+            try:
+                saved = load_last_forecast(city_name)
+            except Exception as e:
+                print(f"Не удалось прочитать сохраненный прогноз: {e}")
+                saved = None
+            if saved:
+                previous = saved[1]
+                self.call_in_ui(self.show_last_forecast, request_id, saved)
+        data = self.get_watchlist_forecast(city_name) or self.get_forecast_data(city_name)
+        self.call_in_ui(self.on_weather_data, request_id, data)
+        if data:
+            try:
+                save_last_forecast(city_name, data)
+            except Exception as e:
+                print(f"Не удалось сохранить прогноз: {e}")
+        if data and with_ai and previous:
+            kinds = ("comfort", "recommendation")
+            if all(kind in previous and not conditions_changed(previous[kind][1], data.current) for kind in kinds):
+                self.call_in_ui(self.show_comfort_score, answer_id, previous["comfort"][0])
+                self.call_in_ui(self.show_recommendation, answer_id, previous["recommendation"][0])
+                return
+        if data and with_ai:
+            # Запросы к нейросети независимы, поэтому отправляем их параллельно
+            self.executor.submit(self.load_comfort_score, answer_id, city_name, data.current)
+            self.executor.submit(self.load_recommendation, answer_id, city_name, data.current)
+
+    def on_weather_data(self, request_id, data):
+        """Отображает полученный прогноз (вызывается в главном потоке)."""
+        if request_id != self.request_id:
+            return  # Пока данные загружались, пользователь выбрал другой город
+        if not data and self.stale_time:
+            # Нет связи: оставляем на экране сохраненный прогноз и ответы нейросети
+            self.set_status(f"⚠️ Нет связи с сервером, данные {self.format_as_of(self.stale_time)}")
+            if "comfort" not in self.stale_answers:
+                self.label_comfort.configure(text="🌟 Оценка комфорта: --/10")
+            if "recommendation" not in self.stale_answers:
+                self.label_recommendation.configure(text="Рекомендация от Нейросети: нет связи с сервером")
+            return
+        self.set_status(None)
+        self.stale_time = None
+        self.saved_answers = {}
+        self.weather_data = data
+        self.hourly_data = data
+        self.data_city = normalize_city_name(self.current_city) if data else None
+        if data:
+            self.show_current_weather(data.current)
+        else:
+            self.label_comfort.configure(text="🌟 Оценка комфорта: --/10")
+            self.label_recommendation.configure(text="Рекомендация от Нейросети: не удалось получить данные о погоде")
+        self.mark_dirty("Прогноз на 7 дней", "Почасовые Погодные Переменные")
+
+    def mark_dirty(self, *tab_names):
+        """Отмечает вкладки, которые нужно перерисовать при следующем показе."""
+        self.dirty_tabs.update(tab_names)
+        self.render_visible_tab()
+
+    def render_visible_tab(self):
+        """Перерисовывает открытую вкладку, если ее данные изменились."""
+        renderers = {
+            "Прогноз на 7 дней": self.update_7_day_weather,
+            "Почасовые Погодные Переменные": self.update_hourly_weather
+        }
+        if self.visible_tab in self.dirty_tabs and self.visible_tab in renderers:
+            self.dirty_tabs.discard(self.visible_tab)
+            with span("ui.render", tab=self.visible_tab):
+                renderers[self.visible_tab]()
+
+    def call_in_ui(self, callback, *args):
+        """Передает вызов в главный поток (можно вызывать из любого потока)."""
+        self.ui_queue.put((callback, args))
+
+    def process_ui_queue(self):
+        """Выполняет в главном потоке вызовы, переданные фоновыми задачами."""
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Ошибка при обновлении интерфейса: {e}")
+        self.root.after(UI_POLL_MS, self.process_ui_queue)
+
+    def set_status(self, text):
+        """Показывает состояние данных на вкладках погоды (None - скрыть)."""
+        for label in (self.label_loading_weather, self.label_loading_forecast, self.label_loading_hourly):
+            if text:
+                label.configure(text=text)
+                label.grid(row=0, column=0, padx=10, pady=5, sticky="e")
+            else:
+                label.grid_remove()
+
+    def add_to_watchlist(self):
+        """Добавляет город из поля ввода в список отслеживаемых."""
+        city_name = self.watchlist_entry.get().strip()
+        keys = [normalize_city_name(city) for city in self.watchlist]
+        if city_name and normalize_city_name(city_name) not in keys:
+            self.watchlist.append(city_name)
+            self.save_settings()
+            self.build_watchlist_rows()
+            self.refresh_watchlist()
+        self.watchlist_entry.delete(0, "end")
+
+    def remove_from_watchlist(self, city_name):
+        """Удаляет город из списка отслеживаемых."""
+        self.watchlist.remove(city_name)
+        self.watchlist_forecasts.pop(normalize_city_name(city_name), None)
+        self.save_settings()
+        self.build_watchlist_rows()
+
+    def open_city(self, city_name):
+        """Открывает прогноз для города (из списка или из прошлого запуска)."""
+        self.city_name_entry.delete(0, "end")
+        self.city_name_entry.insert(0, city_name)
+        self.check_city_input()
+        self.set_city()
+
+    @timed("ui.watchlist_rows")
+    def build_watchlist_rows(self):
+        """Создает строки сводки для городов из списка."""
+        for widget in self.frame_watchlist_rows.winfo_children():
+            widget.destroy()
+        self.watchlist_rows = {}
+        for row, city_name in enumerate(self.watchlist):
+            city_frame = ctk.CTkFrame(self.frame_watchlist_rows, corner_radius=10)
+            city_frame.grid(row=row, column=0, padx=5, pady=5, sticky="ew")
+            city_frame.grid_columnconfigure(0, weight=1)
+
+            label_city = ctk.CTkLabel(city_frame, text=city_name, font=("Arial", 16, "bold"))
+            label_city.grid(row=0, column=0, padx=10, pady=(5, 0), sticky="w")
+
+            label_summary = ctk.CTkLabel(city_frame, text="--", font=("Arial", 14), justify="left")
+            label_summary.grid(row=1, column=0, padx=10, pady=(0, 5), sticky="w")
+
+            button_open = ctk.CTkButton(city_frame, text="Открыть", width=90, fg_color="#4CAF50", hover_color="#45a049",
+                                        command=lambda city=city_name: self.open_city(city))
+            button_open.grid(row=0, column=1, rowspan=2, padx=5, pady=5)
+            button_remove = ctk.CTkButton(city_frame, text="✕", width=40, fg_color="gray", hover_color="#a04545",
+                                          command=lambda city=city_name: self.remove_from_watchlist(city))
+            button_remove.grid(row=0, column=2, rowspan=2, padx=5, pady=5)
+
+            self.watchlist_rows[normalize_city_name(city_name)] = label_summary
+            cached = self.watchlist_forecasts.get(normalize_city_name(city_name))
+            if cached:
+                label_summary.configure(text=self.format_watchlist_summary(cached[0]))
+
+    def refresh_watchlist(self, refresh=False):
+        """Запускает фоновое обновление прогнозов для всех городов из списка.
+
+        refresh=True (кнопка "Обновить все") запрашивает прогнозы у OpenMeteo заново,
+        иначе берутся прогнозы из хранилища, если они еще не устарели.
+        """
+        if self.watchlist:
+            self.label_loading_watchlist.grid(row=0, column=0, padx=10, pady=5, sticky="e")
+            self.executor.submit(self.load_watchlist, list(self.watchlist), refresh)
+
+    def load_watchlist(self, cities, refresh=False):
+        """Фоновая задача: загружает прогнозы всех городов из списка одним запросом."""
+        coordinates = {}
+        for city_name in cities:
+            try:
+                coordinates[city_name] = get_coordinates(city_name)
+            except Exception as e:
+                print(e)
+        forecasts = {}
+        try:
+            if coordinates:
+                results = fetch_forecasts(list(coordinates.values()), MAX_FORECAST_DAYS, refresh)
+                forecasts = dict(zip(coordinates.keys(), results))
+        except Exception as e:
+            print(f"Ошибка при запросе: {e}")
+        self.call_in_ui(self.on_watchlist_data, cities, forecasts)
+
+    def on_watchlist_data(self, cities, forecasts):
+        """Отображает сводку по городам из списка (вызывается в главном потоке)."""
+        self.label_loading_watchlist.grid_remove()
+        for city_name in cities:
+            key = normalize_city_name(city_name)
+            forecast = forecasts.get(city_name)
+            if forecast:
+                self.watchlist_forecasts[key] = (forecast, time.time())
+            label_summary = self.watchlist_rows.get(key)
+            if label_summary:
+                label_summary.configure(text=self.format_watchlist_summary(forecast) if forecast else "Не удалось получить данные")
+
+    def get_watchlist_forecast(self, city_name):
+        """Возвращает свежий прогноз из последнего обновления списка городов, если он есть."""
+        cached = self.watchlist_forecasts.get(normalize_city_name(city_name))
+        if cached:
+            forecast, loaded_at = cached
+            if time.time() - loaded_at < WATCHLIST_MAX_AGE:
+                return forecast.head(self.forecast_days)
+        return None
+
+    def is_watchlist_stale(self):
+        """Проверяет, есть ли в списке города без свежего прогноза."""
+        for city_name in self.watchlist:
+            cached = self.watchlist_forecasts.get(normalize_city_name(city_name))
+            if not cached or time.time() - cached[1] > WATCHLIST_MAX_AGE:
+                return True
+        return False
+
+    def format_watchlist_summary(self, forecast):
+        """Краткая сводка погоды для строки списка городов."""
+        current = forecast.current
+        daily = forecast.daily
+        return (
+            f"🌡️ {int(current['temperature_2m'])}°C (по ощущениям {int(current['apparent_temperature'])}°C), "
+            f"{get_weathercode_description(current['weathercode'])}, "
+            f"💨 {int(current['windspeed_10m'])} м/с, 💧 {int(current['relative_humidity_2m'])}%\n"
+            f"Сегодня: {format_number(daily['temperature_2m_min'][0])}…{format_number(daily['temperature_2m_max'][0])}°C, "
+            f"осадки {format_number(daily['precipitation_sum'][0])} мм"
+        )
+
+    def get_forecast_data(self, city_name):
+        """Получает текущую погоду, прогноз по дням и почасовой прогноз одним запросом."""
+        try:
+            forecast = get_forecast(city_name, self.forecast_days)
+            print(f"Город: {city_name}, Широта: {forecast.latitude}, Долгота: {forecast.longitude}")
+            return forecast
+        except CityNotFoundError as e:
+            print(e)
+            return None
+        except Exception as e:
+            print(f"Ошибка при запросе: {e}")
+            return None
+
+    @timed("ui.current_weather")
+    def show_current_weather(self, current):
+        """Отображает текущую погоду."""
+        labels = [
+            self.label_temperature, self.label_feels_like, self.label_humidity, self.label_precipitation,
+            self.label_wind, self.label_wind_direction, self.label_cloudcover, self.label_weathercode
+        ]
+        for label, text in zip(labels, format_current_weather(current)):
+            label.configure(text=text)
+        self.label_comfort_local.configure(text=f"🧮 Индекс комфорта: {format_comfort(current_comfort(current))}/10")
+
+    def load_comfort_score(self, answer_id, city_name, current):
+        """Фоновая задача: получает оценку комфорта погоды от GigaChat."""
+        try:
+            comfort_score = get_comfort_score(current)
+            save_last_answer(city_name, "comfort", comfort_score, current)
+        except Exception as e:
+            print(f"Ошибка GigaChat: {e}")
+            comfort_score = None
+        self.call_in_ui(self.show_comfort_score, answer_id, comfort_score)
+
+    def load_recommendation(self, answer_id, city_name, current):
+        """Фоновая задача: получает рекомендацию по одежде от GigaChat и показывает ее по мере генерации."""
+        parts = []
+        try:
+            with closing(stream_recommendation(current)) as stream:
+                for chunk in stream:
+                    if answer_id != self.answer_id:
+                        return  # Пользователь выбрал другой город: закрываем поток и не ждем конца ответа
+                    parts.append(chunk)
+                    self.call_in_ui(self.show_recommendation_part, answer_id, "".join(parts))
+            giga_response = "".join(parts)
+            print(giga_response)
+            save_last_answer(city_name, "recommendation", giga_response, current)
+        except Exception as e:
+            print(f"Ошибка GigaChat: {e}")
+            giga_response = "".join(parts) + " … (ответ прерван)" if parts else None
+        self.call_in_ui(self.show_recommendation, answer_id, giga_response)
+
+    def show_comfort_score(self, answer_id, comfort_score):
+        """Отображает оценку комфорта от нейросети (без ответа оставляет сохраненную)."""
+        if answer_id != self.answer_id:
+            return
+        if comfort_score is None:
+            comfort_score = self.stale_answers.get("comfort", "--")
+        self.label_comfort.configure(text=f"🌟 Оценка комфорта от Нейросети: {comfort_score}/10")
+
+    def show_recommendation_part(self, answer_id, text):
+        """Показывает уже полученную часть рекомендации."""
+        if answer_id == self.answer_id:
+            self.label_recommendation.configure(text=f"Рекомендация от Нейросети: {text}▌")
+
+    def show_recommendation(self, answer_id, recommendation):
+        """Отображает рекомендацию от нейросети (без ответа оставляет сохраненную)."""
+        if answer_id != self.answer_id:
+            return
+        if recommendation is None:
+            recommendation = self.stale_answers.get("recommendation", "нейросеть недоступна")
+        self.label_recommendation.configure(text=f"Рекомендация от Нейросети: {recommendation}")
+
+    @timed("ui.forecast_rows")
+    def show_weather_forecast(self, data, frame):
+        """Отображает текстовый прогноз погоды."""
+        for widget in frame.winfo_children():
+            widget.destroy()
+
+        daily = data.daily
+        times = daily.time_labels()
+        temp_max = daily['temperature_2m_max']
+        temp_min = daily['temperature_2m_min']
+        apparent_temp_max = daily['apparent_temperature_max']
+        apparent_temp_min = daily['apparent_temperature_min']
+        precipitation = daily['precipitation_sum']
+        precipitation_probability = daily['precipitation_probability_max']
+        windspeed = daily['windspeed_10m_max']
+        winddirection = daily['winddirection_10m_dominant']
+        sunrise = np.datetime_as_string(daily['sunrise'], unit='m')
+        sunset = np.datetime_as_string(daily['sunset'], unit='m')
+        daylight = daily['sunset'] - daily['sunrise']
+        uv_index = daily['uv_index_max']
+        weathercode = daily['weathercode']
+        comfort = daily_comfort(daily)
+
+        for i in range(len(times)):
+            day_frame = ctk.CTkFrame(frame, corner_radius=10)
+            day_frame.pack(fill="x", padx=5, pady=5)
+
+            label_day = ctk.CTkLabel(day_frame, text=times[i], font=("Arial", 16, "bold"))
+            label_day.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+
+            label_temp = ctk.CTkLabel(day_frame, text=f"🌡️ Макс.: {format_number(temp_max[i])}°C, Мин.: {format_number(temp_min[i])}°C", font=("Arial", 14))
+            label_temp.grid(row=1, column=0, padx=10, pady=2, sticky="w")
+
+            label_apparent_temp = ctk.CTkLabel(day_frame, text=f"🌡️ Макс. по ощущениям: {format_number(apparent_temp_max[i])}°C, Мин. по ощущениям: {format_number(apparent_temp_min[i])}°C", font=("Arial", 14))
+            label_apparent_temp.grid(row=2, column=0, padx=10, pady=2, sticky="w")
+
+            label_precip = ctk.CTkLabel(day_frame, text=f"🌧️ Осадки: {format_number(precipitation[i])} мм", font=("Arial", 14))
+            label_precip.grid(row=3, column=0, padx=10, pady=2, sticky="w")
+
+            label_precip_prob = ctk.CTkLabel(day_frame, text=f"🌧️ Вероятность осадков: {format_number(precipitation_probability[i])}%", font=("Arial", 14))
+            label_precip_prob.grid(row=4, column=0, padx=10, pady=2, sticky="w")
+
+            label_wind = ctk.CTkLabel(day_frame, text=f"💨 Ветер: {format_number(windspeed[i])} м/с", font=("Arial", 14))
+            label_wind.grid(row=5, column=0, padx=10, pady=2, sticky="w")
+
+            label_wind_direction = ctk.CTkLabel(day_frame, text=f"🧭 Преобладающее направление ветра: {get_wind_direction(winddirection[i])}", font=("Arial", 14))
+            label_wind_direction.grid(row=6, column=0, padx=10, pady=2, sticky="w")
+
+            label_sunrise = ctk.CTkLabel(day_frame, text=f"🌅 Восход: {sunrise[i]}", font=("Arial", 14))
+            label_sunrise.grid(row=7, column=0, padx=10, pady=2, sticky="w")
+
+            label_sunset = ctk.CTkLabel(day_frame, text=f"🌇 Закат: {sunset[i]}", font=("Arial", 14))
+            label_sunset.grid(row=8, column=0, padx=10, pady=2, sticky="w")
+
+            label_daylight = ctk.CTkLabel(day_frame, text=f"🌞 Продолжительность светового дня: {calculate_daylight_duration(daylight[i])}", font=("Arial", 14))
+            label_daylight.grid(row=9, column=0, padx=10, pady=2, sticky="w")
+
+            label_uv_index = ctk.CTkLabel(day_frame, text=f"☀️ УФ индекс: {format_number(uv_index[i])}", font=("Arial", 14))
+            label_uv_index.grid(row=10, column=0, padx=10, pady=2, sticky="w")
+
+            label_weathercode = ctk.CTkLabel(day_frame, text=f"🌤️ Погодный код: {get_weathercode_description(weathercode[i])}", font=("Arial", 14))
+            label_weathercode.grid(row=11, column=0, padx=10, pady=2, sticky="w")
+
+            label_comfort = ctk.CTkLabel(day_frame, text=f"🧮 Индекс комфорта: {format_comfort(comfort[i])}/10", font=("Arial", 14))
+            label_comfort.grid(row=12, column=0, padx=10, pady=2, sticky="w")
+
+    def plot_weather(self, data):
+        """Обновляет графики прогноза погоды."""
+        self.daily_charts.update(data.daily)
+
+    def show_hourly_weather_forecast(self, data, frame):
+        """Отображает текстовый почасовой прогноз погоды (строки создаются только для видимой части)."""
+        self.hourly_comfort = hourly_comfort(data.hourly)
+        frame.set_count(len(data.hourly))
+
+    def make_hourly_row(self, parent):
+        """Создает переиспользуемую строку почасового прогноза."""
+        hour_frame = ctk.CTkFrame(parent, corner_radius=10, height=HOURLY_ROW_HEIGHT - 10)
+        hour_frame.grid_propagate(False)
+        hour_frame.label_time = ctk.CTkLabel(hour_frame, text="", font=("Arial", 16, "bold"))
+        hour_frame.label_time.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        hour_frame.label_details = ctk.CTkLabel(hour_frame, text="", font=("Arial", 14), justify="left")
+        hour_frame.label_details.grid(row=1, column=0, padx=10, pady=2, sticky="w")
+        return hour_frame
+
+    def bind_hourly_row(self, hour_frame, i):
+        """Заполняет строку почасового прогноза данными за i-й час."""
+        hourly = self.hourly_data.hourly
+        value = lambda name: format_number(hourly[name][i])
+        hour_frame.label_time.configure(text=f"{np.datetime_as_string(hourly.time[i], unit='m')}    🧮 {format_comfort(self.hourly_comfort[i])}/10")
+        hour_frame.label_details.configure(text="\n".join([
+            f"🌡️ Температура: {value('temperature_2m')}°C    💧 Влажность: {value('relative_humidity_2m')}%",
+            f"🌧️ Осадки: {value('precipitation')} мм    💨 Ветер: {value('windspeed_10m')} м/с",
+            f"👁️ Видимость: {value('visibility')} м    🌤️ Погодный код: {get_weathercode_description(hourly['weathercode'][i])}",
+            f"🌱 Температура почвы (0 см): {value('soil_temperature_0cm')}°C    (6 см): {value('soil_temperature_6cm')}°C",
+            f"🌱 Температура почвы (18 см): {value('soil_temperature_18cm')}°C    (54 см): {value('soil_temperature_54cm')}°C"
+        ]))
+
+    def plot_hourly_weather(self, data):
+        """Обновляет графики почасового прогноза."""
+        self.hourly_charts.update(data.hourly)
+
+    def update_7_day_weather(self):
+        """Отображает прогноз на 7 дней из последнего ответа OpenMeteo."""
+        if self.current_city:
+            data = self.weather_data
+            if data:
+                self.show_weather_forecast(data, self.frame_forecast)
+                self.plot_weather(data)
+                self.label_no_city.grid_remove()
+            else:
+                self.label_no_city.grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        else:
+            self.label_no_city.grid(row=3, column=0, padx=10, pady=5, sticky="w")
+
+    def update_hourly_weather(self):
+        """Отображает почасовой прогноз из последнего ответа OpenMeteo."""
+        if self.current_city:
+            if self.hourly_data:
+                self.show_hourly_weather_forecast(self.hourly_data, self.frame_hourly)
+                self.plot_hourly_weather(self.hourly_data)
+                self.label_no_city_hourly.grid_remove()
+            else:
+                self.label_no_city_hourly.grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        else:
+            self.label_no_city_hourly.grid(row=3, column=0, padx=10, pady=5, sticky="w")
+
+    def show_tab(self, tab_name):
+        """Переключает между вкладками."""
+        if tab_name == "Город":
+            self.frame_city.grid(row=1, column=1, sticky="nsew")
+            self.frame_weather.grid_remove()
+            self.frame_forecast_tab.grid_remove()
+            self.frame_hourly_tab.grid_remove()
+            self.frame_watchlist.grid_remove()
+            self.frame_settings.grid_remove()
+        elif tab_name == "Погода":
+            self.frame_weather.grid(row=1, column=1, sticky="nsew")
+            self.frame_city.grid_remove()
+            self.frame_forecast_tab.grid_remove()
+            self.frame_hourly_tab.grid_remove()
+            self.frame_watchlist.grid_remove()
+            self.frame_settings.grid_remove()
+        elif tab_name == "Прогноз на 7 дней":
+            self.frame_forecast_tab.grid(row=1, column=1, sticky="nsew")
+            self.frame_city.grid_remove()
+            self.frame_weather.grid_remove()
+            self.frame_hourly_tab.grid_remove()
+            self.frame_watchlist.grid_remove()
+            self.frame_settings.grid_remove()
+        elif tab_name == "Почасовые Погодные Переменные":
+            self.frame_hourly_tab.grid(row=1, column=1, sticky="nsew")
+            self.frame_city.grid_remove()
+            self.frame_weather.grid_remove()
+            self.frame_forecast_tab.grid_remove()
+            self.frame_watchlist.grid_remove()
+            self.frame_settings.grid_remove()
+        elif tab_name == "Список городов":
+            if self.is_watchlist_stale():
+                self.refresh_watchlist()
+            self.frame_watchlist.grid(row=1, column=1, sticky="nsew")
+            self.frame_city.grid_remove()
+            self.frame_weather.grid_remove()
+            self.frame_forecast_tab.grid_remove()
+            self.frame_hourly_tab.grid_remove()
+            self.frame_settings.grid_remove()
+        elif tab_name == "Настройки":
+            self.frame_settings.grid(row=1, column=1, sticky="nsew")
+            self.frame_city.grid_remove()
+            self.frame_weather.grid_remove()
+            self.frame_forecast_tab.grid_remove()
+            self.frame_hourly_tab.grid_remove()
+            self.frame_watchlist.grid_remove()
+        self.visible_tab = tab_name
+        # Даем окну сначала показать вкладку, а потом уже строим списки и графики
+        self.root.after_idle(self.render_visible_tab)
+
+    def on_closing(self):
+        """Завершает приложение при закрытии окна."""
+        print("Приложение закрыто")
+        # Фоновые задачи видят новые request_id и answer_id и перестают обновлять интерфейс и читать ответ
+        self.request_id += 1
+        self.answer_id += 1
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.metrics_after_id:
+            self.root.after_cancel(self.metrics_after_id)
+            self.metrics_after_id = None
+        self.daily_charts.close()
+        self.hourly_charts.close()
+        close_render_pool()
+        # Закрытые соединения прерывают запросы, которые еще выполняются в фоне
+        weather_core.close_clients()
+        self.root.destroy()
+
+
+def main(start_time):
+    """Создает окно и запускает приложение."""
+    # Установка системной темы по умолчанию
+    ctk.set_appearance_mode("system")  # По умолчанию системная тема
+    ctk.set_default_color_theme("blue")  #  тема
+    app = ctk.CTk()
+    weather_app = WeatherApp(app, start_time, startup_report="--startup-report" in sys.argv)
+    app.protocol("WM_DELETE_WINDOW", weather_app.on_closing)
+    app.mainloop()
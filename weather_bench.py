@@ -0,0 +1,414 @@
+"""Бенчмарк AI Weather без сети: локальные заглушки OpenMeteo, Nominatim и GigaChat.
+
+Пример: python -m weather_bench Плёс --runs 3 --warm 5 --latency gigachat=1500 --output bench_results.json
+
+Заглушки отдают ответы из bench_fixtures/ (OpenMeteo - в формате flatbuffers) с заданной
+задержкой. Каждый прогон выполняется в отдельном процессе с пустой папкой кэша: первая
+итерация - холодный кэш, следующие - теплый. Замеряются этапы геокодирования, загрузки,
+разбора ответа, запросов к нейросети, подготовки текста текущей погоды и отрисовки прогноза
+по дням и почасового прогноза (с --charts process - в пуле процессов, до получения всех картинок).
+Город по умолчанию (Плёс) меньше MIN_POPULATION и не попадает во встроенный справочник,
+поэтому этап геокодирования проходит через Nominatim. Для города из справочника
+(например, Москва) координаты находятся без сети.
+Результаты сохраняются в JSON, чтобы сравнивать их между версиями.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+# Задержка ответа заглушек по умолчанию, мс (примерно как у настоящих сервисов)
+BENCH_LATENCY_MS = {"openmeteo": 150, "nominatim": 400, "gigachat": 1200}
+BENCH_CITY = "Плёс"  # Нет во встроенном справочнике городов: координаты запрашиваются у Nominatim
+STAGES = ["geocode", "fetch", "decode", "llm", "format_current", "render_daily", "render_hourly"]
+# Этапы, которые входят в другие и не суммируются в total
+EXTRA_STAGES = ["llm_first_token"]
+STREAM_CHUNK_CHARS = 8  # Столько символов в одном фрагменте потокового ответа заглушки GigaChat
+
+
+def encode_variable(builder, value=None, values=None, values_int64=None):
+    """Записывает VariableWithValues: value - одно число, values/values_int64 - массивы."""
+    values_offset = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32)) if values is not None else None
+    int64_offset = builder.CreateNumpyVector(np.asarray(values_int64, dtype=np.int64)) if values_int64 is not None else None
+    builder.StartObject(13)
+    if value is not None:
+        builder.PrependFloat32Slot(2, value, 0.0)
+    if values_offset is not None:
+        builder.PrependUOffsetTRelativeSlot(3, values_offset, 0)
+    if int64_offset is not None:
+        builder.PrependUOffsetTRelativeSlot(4, int64_offset, 0)
+    return builder.EndObject()
+
+
+def encode_block(builder, start, end, interval, variables):
+    """Записывает VariablesWithTime (блок current, daily или hourly)."""
+    offsets = [encode_variable(builder, **variable) for variable in variables]
+    builder.StartVector(4, len(offsets), 4)
+    for offset in reversed(offsets):
+        builder.PrependUOffsetTRelative(offset)
+    vector = builder.EndVector()
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, end, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    return builder.EndObject()
+
+
+def encode_openmeteo(fixture, latitude, longitude, current, daily, hourly, forecast_days):
+    """Собирает ответ OpenMeteo в формате flatbuffers (с префиксом длины, как у API).
+
+    Переменные записываются в порядке запроса; переменных, которых нет в фикстуре, заполняются NaN.
+    """
+    import flatbuffers
+    start = fixture["start"]
+    hours = forecast_days * 24
+
+    def series(block, names, count):
+        variables = []
+        for name in names:
+            column = fixture[block].get(name)
+            if name in ("sunrise", "sunset"):
+                variables.append({"values_int64": (column or [0] * count)[:count]})
+            else:
+                variables.append({"values": [np.nan if value is None else value for value in column[:count]] if column else [np.nan] * count})
+        return variables
+
+    builder = flatbuffers.Builder(1024)
+    current_offset = encode_block(builder, start + 12 * 3600, start + 12 * 3600 + 900, 900,
+                                  [{"value": fixture["current"].get(name, np.nan)} for name in current])
+    daily_offset = encode_block(builder, start, start + forecast_days * 86400, 86400, series("daily", daily, forecast_days))
+    hourly_offset = encode_block(builder, start, start + hours * 3600, 3600, series("hourly", hourly, hours))
+    builder.StartObject(15)
+    builder.PrependFloat32Slot(0, latitude, 0)
+    builder.PrependFloat32Slot(1, longitude, 0)
+    builder.PrependInt32Slot(6, fixture["utc_offset_seconds"], 0)
+    builder.PrependUOffsetTRelativeSlot(9, current_offset, 0)
+    builder.PrependUOffsetTRelativeSlot(10, daily_offset, 0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly_offset, 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+class FakeUpstreams:
+    """Локальный HTTP-сервер, который отвечает за OpenMeteo, Nominatim и GigaChat."""
+
+    def __init__(self, fixtures_dir, latency_ms):
+        self.latency_ms = latency_ms
+        self.requests = {name: 0 for name in BENCH_LATENCY_MS}
+        self.lock = threading.Lock()
+        with open(os.path.join(fixtures_dir, "openmeteo.json"), encoding="utf-8") as f:
+            self.openmeteo = json.load(f)
+        with open(os.path.join(fixtures_dir, "nominatim.json"), encoding="utf-8") as f:
+            self.nominatim = json.load(f)
+        with open(os.path.join(fixtures_dir, "gigachat.json"), encoding="utf-8") as f:
+            self.gigachat = json.load(f)
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, как у настоящих сервисов
+
+            def do_GET(self):
+                upstreams.handle(self, "GET")
+
+            def do_POST(self):
+                upstreams.handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Останавливает сервер."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def environment(self):
+        """Переменные окружения, которые направляют weather_core и GigaChat на заглушки."""
+        return {
+            "AI_WEATHER_FORECAST_URL": f"{self.url}/v1/forecast",
+            "AI_WEATHER_NOMINATIM_URL": self.url,
+            "GIGACHAT_BASE_URL": f"{self.url}/api/v1",
+            "GIGACHAT_AUTH_URL": f"{self.url}/api/v2/oauth",
+            "GIGACHAT_CREDENTIALS": base64.b64encode(b"bench:bench").decode("ascii"),
+            "MPLBACKEND": "Agg"
+        }
+
+    def handle(self, request, method):
+        """Отвечает на запрос заглушкой нужного сервиса после искусственной задержки."""
+        url = urlsplit(request.path)
+        body = request.rfile.read(int(request.headers.get("Content-Length", 0))) if method == "POST" else b""
+        if url.path.endswith("/forecast"):
+            name, status, content_type, payload = "openmeteo", *self.openmeteo_response(parse_qs(url.query))
+        elif url.path.endswith("/search"):
+            name, status, content_type, payload = "nominatim", *self.nominatim_response(parse_qs(url.query))
+        elif url.path.endswith("/oauth"):
+            expires_at = int((time.time() + 1800) * 1000)
+            name, status, content_type, payload = "gigachat", 200, "application/json", json.dumps({"access_token": "bench", "expires_at": expires_at}).encode("utf-8")
+        elif url.path.endswith("/chat/completions"):
+            request_body = json.loads(body or b"{}")
+            if request_body.get("stream"):
+                with self.lock:
+                    self.requests["gigachat"] += 1
+                self.stream_gigachat(request, request_body)
+                return
+            name, status, content_type, payload = "gigachat", *self.gigachat_response(request_body)
+        else:
+            name, status, content_type, payload = None, 404, "application/json", b'{"error": "not found"}'
+        if name:
+            with self.lock:
+                self.requests[name] += 1
+            time.sleep(self.latency_ms.get(name, 0) / 1000)
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def openmeteo_response(self, query):
+        """Ответ OpenMeteo: по сообщению flatbuffers на каждую пару координат."""
+        def names(key):
+            return [name for value in query.get(key, []) for name in value.split(",")]
+
+        forecast_days = int(query.get("forecast_days", ["7"])[0])
+        latitudes = query["latitude"][0].split(",")
+        longitudes = query["longitude"][0].split(",")
+        payload = b"".join(
+            encode_openmeteo(self.openmeteo, float(latitude), float(longitude), names("current"), names("daily"), names("hourly"), forecast_days)
+            for latitude, longitude in zip(latitudes, longitudes)
+        )
+        return 200, "application/octet-stream", payload
+
+    def nominatim_response(self, query):
+        """Ответ Nominatim: город из фикстуры или пустой список."""
+        city = query.get("q", [""])[0].strip().lower()
+        place = self.nominatim.get(city)
+        return 200, "application/json", json.dumps([place] if place else [], ensure_ascii=False).encode("utf-8")
+
+    def gigachat_answer(self, request_body):
+        """Текст ответа GigaChat из фикстуры, выбранный по содержимому запроса."""
+        prompt = " ".join(message.get("content", "") for message in request_body.get("messages", []))
+        for answer in self.gigachat["answers"]:
+            if answer["match"] in prompt:
+                return prompt, answer["content"]
+        return prompt, self.gigachat["default"]
+
+    def stream_gigachat(self, request, request_body):
+        """Потоковый ответ GigaChat (text/event-stream): задержка до первого фрагмента, затем по фрагменту."""
+        prompt, content = self.gigachat_answer(request_body)
+        chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        # Половина задержки - до первого фрагмента, остальное распределяется по фрагментам
+        latency = self.latency_ms.get("gigachat", 0) / 1000
+        time.sleep(latency / 2)
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+        try:
+            for text in chunks:
+                event = {"choices": [{"delta": {"role": "assistant", "content": text}, "index": 0}],
+                         "created": int(time.time()), "model": request_body.get("model", "GigaChat"), "object": "chat.completion"}
+                self.write_chunk(request, f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                time.sleep(latency / 2 / len(chunks))
+            self.write_chunk(request, b"data: [DONE]\n\n")
+            self.write_chunk(request, b"")
+        except ConnectionError:
+            request.close_connection = True  # Клиент прервал поток (отмена ответа)
+
+    def write_chunk(self, request, data):
+        """Отправляет фрагмент ответа с Transfer-Encoding: chunked."""
+        request.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        request.wfile.flush()
+
+    def gigachat_response(self, request_body):
+        """Ответ GigaChat целиком: текст из фикстуры, выбранный по содержимому запроса."""
+        prompt, content = self.gigachat_answer(request_body)
+        response = {
+            "choices": [{"message": {"role": "assistant", "content": content}, "index": 0, "finish_reason": "stop"}],
+            "created": int(time.time()),
+            "model": request_body.get("model", "GigaChat"),
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()), "total_tokens": len(prompt.split()) + len(content.split())},
+            "object": "chat.completion"
+        }
+        return 200, "application/json", json.dumps(response, ensure_ascii=False).encode("utf-8")
+
+
+def render_in_processes(charts, block):
+    """Рисует графики в пуле процессов и ждет все картинки."""
+    from weather_charts import submit_charts, DEFAULT_IMAGE_SIZE
+    return [future.result() for future in submit_charts(charts, block, *DEFAULT_IMAGE_SIZE)]
+
+
+def measure(city_name, days, renderers):
+    """Одна итерация set_city: время каждого этапа в миллисекундах."""
+    import weather_core
+    import weather_metrics
+    from weather_comfort import current_comfort, format_comfort
+    timings = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    coordinates = stage("geocode", weather_core.get_coordinates, city_name)
+    # Прогноз берется тем же путем, что и в приложении: из хранилища или одним запросом на MAX_FORECAST_DAYS.
+    # Разбор ответа (только при загрузке) берется из замеров и вычитается из fetch
+    spans = weather_metrics.recent_spans(1)
+    last_seq = spans[-1]["seq"] if spans else 0
+    forecast = stage("fetch", weather_core.fetch_forecasts, [coordinates], days)[0]
+    timings["decode"] = sum(item["duration_ms"] for item in weather_metrics.recent_spans() if item["seq"] > last_seq and item["name"] == "decode")
+    timings["fetch"] -= timings["decode"]
+    start = time.perf_counter()
+    weather_core.get_comfort_score(forecast.current)
+    # Рекомендация читается потоком, как в приложении: отдельно замеряем время до первого фрагмента
+    stream_start = time.perf_counter()
+    for chunk in weather_core.stream_recommendation(forecast.current):
+        timings.setdefault("llm_first_token", (time.perf_counter() - stream_start) * 1000)
+    timings["llm"] = (time.perf_counter() - start) * 1000
+    # Без окна виджеты не создать: замеряем подготовку текста и индекса комфорта для панели текущей погоды
+    stage("format_current", lambda current: (weather_core.format_current_weather(current), format_comfort(current_comfort(current))), forecast.current)
+    stage("render_daily", renderers[0], forecast.daily)
+    stage("render_hourly", renderers[1], forecast.hourly)
+    timings["total"] = sum(timings[name] for name in STAGES)
+    return timings
+
+
+def run_worker(city_name, days, warm, charts):
+    """Процесс одного прогона: холодная итерация и warm теплых. Печатает JSON."""
+    start = time.perf_counter()
+    import weather_core
+    from weather_charts import ChartPanel, DAILY_CHARTS, HOURLY_CHARTS, close_render_pool
+    import_ms = (time.perf_counter() - start) * 1000
+    if charts == "process":
+        renderers = (lambda block: render_in_processes(DAILY_CHARTS, block), lambda block: render_in_processes(HOURLY_CHARTS, block))
+    else:
+        renderers = (ChartPanel(None, DAILY_CHARTS).update, ChartPanel(None, HOURLY_CHARTS).update)
+    iterations = []
+    for i in range(1 + warm):
+        iterations.append({"cache": "cold" if i == 0 else "warm", "stages_ms": measure(city_name, days, renderers)})
+    close_render_pool()
+    json.dump({"import_ms": import_ms, "imports_ms": weather_core.import_report(), "iterations": iterations}, sys.stdout)
+
+
+def summarize(runs):
+    """Медианы по этапам отдельно для холодного и теплого кэша."""
+    summary = {}
+    for cache in ("cold", "warm"):
+        samples = [iteration["stages_ms"] for run in runs for iteration in run["iterations"] if iteration["cache"] == cache]
+        if samples:
+            summary[cache] = {name: round(statistics.median(sample[name] for sample in samples), 2) for name in STAGES + EXTRA_STAGES + ["total"]}
+    return summary
+
+
+def git_commit():
+    """Текущий коммит репозитория (или None вне git)."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_latency(values):
+    """Разбирает --latency openmeteo=150 в словарь задержек."""
+    latency = dict(BENCH_LATENCY_MS)
+    for value in values:
+        name, _, ms = value.partition("=")
+        if name not in latency or not ms:
+            raise argparse.ArgumentTypeError(f"Неверная задержка {value}: ожидается имя=мс, имя из {', '.join(latency)}")
+        latency[name] = float(ms)
+    return latency
+
+
+def main(argv=None):
+    """Запускает заглушки и прогоны, сохраняет результаты. Возвращает код завершения."""
+    parser = argparse.ArgumentParser(prog="python -m weather_bench", description="Бенчмарк AI Weather на локальных заглушках сервисов")
+    parser.add_argument("city", nargs="?", default=BENCH_CITY, help=f"город из bench_fixtures/nominatim.json или справочника (по умолчанию {BENCH_CITY}, геокодирование через Nominatim)")
+    parser.add_argument("--days", type=int, default=7, choices=range(1, 17), metavar="1-16", help="длительность прогноза (по умолчанию 7)")
+    parser.add_argument("--runs", type=int, default=3, help="прогонов с холодным кэшем (по умолчанию 3)")
+    parser.add_argument("--warm", type=int, default=5, help="итераций с теплым кэшем в каждом прогоне (по умолчанию 5)")
+    parser.add_argument("--latency", action="append", default=[], metavar="ИМЯ=МС", help="задержка заглушки: openmeteo, nominatim или gigachat")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="папка с ответами заглушек")
+    parser.add_argument("--output", default="bench_results.json", help="файл результатов (по умолчанию bench_results.json)")
+    parser.add_argument("--charts", default="inline", choices=["inline", "process"], help="отрисовка графиков: в процессе прогона или в пуле процессов")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.city, args.days, args.warm, args.charts)
+        return 0
+
+    try:
+        latency = parse_latency(args.latency)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    upstreams = FakeUpstreams(args.fixtures, latency)
+    upstreams.start()
+    runs = []
+    try:
+        for run in range(args.runs):
+            with tempfile.TemporaryDirectory(prefix="weather_bench_") as cache_dir:
+                env = dict(os.environ, AI_WEATHER_CACHE_DIR=cache_dir, **upstreams.environment())
+                requests_before = dict(upstreams.requests)
+                command = [sys.executable, "-m", "weather_bench", args.city, "--days", str(args.days), "--warm", str(args.warm), "--charts", args.charts, "--worker"]
+                process = subprocess.run(command, env=env, capture_output=True, text=True,
+                                         cwd=os.path.dirname(os.path.abspath(__file__)))
+                if process.returncode != 0:
+                    print(process.stderr, file=sys.stderr)
+                    print(f"Прогон {run + 1} завершился с ошибкой", file=sys.stderr)
+                    return 1
+                result = json.loads(process.stdout.strip().splitlines()[-1])
+                result["upstream_requests"] = {name: upstreams.requests[name] - requests_before[name] for name in upstreams.requests}
+                runs.append(result)
+    finally:
+        upstreams.stop()
+
+    report = {
+        "benchmark": "set_city",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "city": args.city,
+        "days": args.days,
+        "charts": args.charts,
+        "latency_ms": latency,
+        "summary": summarize(runs),
+        "runs": runs
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'этап':<16}{'холодный, мс':>14}{'теплый, мс':>14}")
+    for name in STAGES + EXTRA_STAGES + ["total"]:
+        cold = report["summary"].get("cold", {}).get(name, float("nan"))
+        warm = report["summary"].get("warm", {}).get(name, float("nan"))
+        print(f"{name:<16}{cold:>14.1f}{warm:>14.1f}")
+    print(f"Результаты сохранены в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
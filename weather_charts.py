@@ -0,0 +1,411 @@
+"""Графики прогноза AI Weather (matplotlib загружается при первом построении).
+
+Ось времени числовая (дни matplotlib), поэтому подписи расставляет AutoDateLocator, а не
+каждая n-я точка. Перед отрисовкой длинные серии прореживаются методом LTTB (Largest
+Triangle Three Buckets) до ширины графика в пикселях: больше точек на экране все равно не
+видно, а пики и провалы сохраняются. Перекрестие и подсказка при наведении мыши рисуются
+блиттингом: копируется готовая картинка графика, и поверх нее перерисовываются только они.
+
+ImageChartPanel строит те же графики в пуле процессов (чистый Agg, без Tk) и показывает
+готовые картинки RGBA, поэтому главный поток не ждет компоновки и растеризации, а графики
+рисуются параллельно на нескольких ядрах. Подсказок при наведении в этом режиме нет.
+"""
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from weather_core import timed_import, format_number
+from weather_metrics import timed, record_span
+
+# Графики: заголовок, тип ("line" или "bar") и серии (переменная, подпись, цвет)
+DAILY_CHARTS = [
+    ("Температура", "line", [("temperature_2m_max", "Макс. температура (°C)", "red"), ("temperature_2m_min", "Мин. температура (°C)", "blue")]),
+    ("Температура по ощущениям", "line", [("apparent_temperature_max", "Макс. температура по ощущениям (°C)", "orange"), ("apparent_temperature_min", "Мин. температура по ощущениям (°C)", "purple")]),
+    ("Осадки", "bar", [("precipitation_sum", "Осадки (мм)", "green")]),
+    ("Вероятность осадков", "bar", [("precipitation_probability_max", "Вероятность осадков (%)", "blue")]),
+    ("Скорость ветра", "line", [("windspeed_10m_max", "Скорость ветра (м/с)", "orange")]),
+    ("УФ индекс", "line", [("uv_index_max", "УФ индекс", "purple")])
+]
+HOURLY_CHARTS = [
+    ("Температура", "line", [("temperature_2m", "Температура (°C)", "red")]),
+    ("Влажность", "line", [("relative_humidity_2m", "Влажность (%)", "blue")]),
+    ("Осадки", "bar", [("precipitation", "Осадки (мм)", "green")]),
+    ("Скорость ветра", "line", [("windspeed_10m", "Скорость ветра (м/с)", "orange")]),
+    ("Видимость", "line", [("visibility", "Видимость (м)", "purple")]),
+    ("Температура почвы (0 см)", "line", [("soil_temperature_0cm", "Температура почвы (0 см)", "brown")]),
+    ("Температура почвы (6 см)", "line", [("soil_temperature_6cm", "Температура почвы (6 см)", "purple")]),
+    ("Температура почвы (18 см)", "line", [("soil_temperature_18cm", "Температура почвы (18 см)", "brown")]),
+    ("Температура почвы (54 см)", "line", [("soil_temperature_54cm", "Температура почвы (54 см)", "purple")])
+]
+
+MIN_CHART_POINTS = 50  # Меньше точек не оставляем даже на очень узком графике
+BAR_WIDTH = 0.8  # Ширина столбца относительно шага между точками
+MAX_TICKS = 8
+# Подписи оси времени цифрами (без английских названий месяцев)
+DATE_FORMATS = ["%Y", "%m.%Y", "%d.%m", "%H:%M", "%H:%M", "%S.%f"]
+DATE_ZERO_FORMATS = ["", "%Y", "%d.%m", "%d.%m", "%H:%M", "%H:%M"]
+DATE_OFFSET_FORMATS = ["", "%Y", "%m.%Y", "%d.%m.%Y", "%d.%m.%Y", "%d.%m.%Y %H:%M"]
+
+# Отрисовка в пуле процессов
+RENDER_PROCESSES = min(multiprocessing.cpu_count(), 4)
+CHART_DPI = 100
+DEFAULT_IMAGE_SIZE = (800, 400)  # Пикселей, если ширина окна еще неизвестна
+MIN_IMAGE_WIDTH = 300
+IMAGE_PADDING = 30  # Отступы и полоса прокрутки вокруг картинок
+
+
+def lttb(x, y, threshold):
+    """Прореживает серию до threshold точек методом LTTB. Возвращает (x, y).
+
+    Из каждой корзины берется точка, образующая наибольший треугольник с соседними
+    корзинами. В классическом LTTB левая вершина - точка, выбранная в предыдущей корзине;
+    здесь это среднее предыдущей корзины, поэтому все корзины считаются сразу массивами.
+    Первая и последняя точки сохраняются. Пропуски (NaN) при выборе считаются нулями.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    x = np.asarray(x, dtype=np.float64)
+    values = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    # Корзины делят точки между первой и последней: [edges[i], edges[i + 1])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sizes = ends - starts
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(values)))
+    mean_x = (sum_x[ends] - sum_x[starts]) / sizes
+    mean_y = (sum_y[ends] - sum_y[starts]) / sizes
+    # Левая вершина - среднее предыдущей корзины (для первой - первая точка),
+    # правая - среднее следующей корзины (для последней - последняя точка)
+    left_x = np.concatenate(([x[0]], mean_x[:-1]))
+    left_y = np.concatenate(([values[0]], mean_y[:-1]))
+    right_x = np.concatenate((mean_x[1:], [x[-1]]))
+    right_y = np.concatenate((mean_y[1:], [values[-1]]))
+
+    bucket = np.repeat(np.arange(len(sizes)), sizes)
+    points = np.arange(1, n - 1)
+    area = np.abs(
+        (left_x[bucket] - right_x[bucket]) * (values[points] - left_y[bucket])
+        - (left_x[bucket] - x[points]) * (right_y[bucket] - left_y[bucket])
+    )
+    # Номер точки с наибольшей площадью в каждой корзине
+    best = np.maximum.reduceat(area, starts - 1)
+    candidates = np.flatnonzero(area == best[bucket])
+    _, first = np.unique(bucket[candidates], return_index=True)
+    chosen = np.concatenate(([0], points[candidates[first]], [n - 1]))
+    return x[chosen], np.asarray(y)[chosen]
+
+
+def setup_axes(ax, title):
+    """Заголовок и ось времени с подписями дат."""
+    mdates = timed_import("matplotlib.dates")
+    ax.set_title(title)
+    ax.set_xmargin(0.01)
+    locator = mdates.AutoDateLocator(maxticks=MAX_TICKS)
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(
+        locator, formats=DATE_FORMATS, zero_formats=DATE_ZERO_FORMATS, offset_formats=DATE_OFFSET_FORMATS
+    ))
+
+
+def get_bar_width(x):
+    """Ширина столбца по шагу между точками (в днях matplotlib)."""
+    return BAR_WIDTH * (float(np.median(np.diff(x))) if len(x) > 1 else 1.0)
+
+
+def render_chart(chart, times, values, width, height):
+    """Рисует один график в Agg и возвращает (ширина, высота, байты RGBA).
+
+    Выполняется в процессе пула: получает только массивы (times - datetime64,
+    values - переменная -> массив), без Tk и без общих объектов с главным процессом.
+    """
+    Figure = timed_import("matplotlib.figure").Figure
+    FigureCanvasAgg = timed_import("matplotlib.backends.backend_agg").FigureCanvasAgg
+    x = timed_import("matplotlib.dates").date2num(times)
+    title, kind, series = chart
+    fig = Figure(figsize=(width / CHART_DPI, height / CHART_DPI), dpi=CHART_DPI)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    setup_axes(ax, title)
+    threshold = max(int(ax.bbox.width), MIN_CHART_POINTS)
+    for key, label, color in series:
+        xs, ys = lttb(x, values[key], threshold)
+        if kind == "bar":
+            ax.bar(xs, ys, width=get_bar_width(xs), label=label, color=color)
+        else:
+            ax.plot(xs, ys, label=label, color=color)
+    ax.legend()
+    fig.tight_layout()
+    canvas.draw()
+    image_width, image_height = canvas.get_width_height()
+    return image_width, image_height, bytes(canvas.buffer_rgba())
+
+
+def warm_up_renderer():
+    """Загружает matplotlib в процессе пула заранее, до первого графика."""
+    timed_import("matplotlib.figure")
+    timed_import("matplotlib.backends.backend_agg")
+    timed_import("matplotlib.dates")
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Возвращает общий пул процессов для отрисовки графиков (создается при первом обращении)."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: fork процесса с Tk и фоновыми потоками может зависнуть
+            context = multiprocessing.get_context("spawn")
+            _render_pool = ProcessPoolExecutor(max_workers=RENDER_PROCESSES, mp_context=context, initializer=warm_up_renderer)
+        return _render_pool
+
+
+def close_render_pool():
+    """Останавливает пул процессов отрисовки."""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_charts(charts, block, width, height):
+    """Отправляет все графики в пул процессов. Возвращает список Future в порядке charts."""
+    pool = get_render_pool()
+    futures = []
+    for chart in charts:
+        values = {key: block[key] for key, label, color in chart[2]}
+        futures.append(pool.submit(render_chart, chart, block.time, values, width, height))
+    return futures
+
+
+class ChartPanel:
+    """Набор графиков, которые создаются один раз и при обновлении только меняют данные."""
+
+    def __init__(self, frame, charts):
+        self.frame = frame  # None - рисовать без окна (FigureCanvasAgg), например в weather_bench
+        self.charts = charts
+        self.figures = []
+        self.canvases = []
+        self.artists = []  # Линии или столбцы для каждой серии каждого графика
+        self.hover = []  # (перекрестие, подсказка) для каждого графика
+        self.backgrounds = {}  # Номер графика -> картинка без перекрестия для блиттинга
+        self.block = None  # Последние данные (ForecastSeries) без прореживания
+        self.x = None  # Ось времени в днях matplotlib
+
+    def build(self):
+        """Создает фигуры и холсты (один раз)."""
+        Figure = timed_import("matplotlib.figure").Figure
+        if self.frame is None:
+            canvas_class = timed_import("matplotlib.backends.backend_agg").FigureCanvasAgg
+        else:
+            canvas_class = timed_import("matplotlib.backends.backend_tkagg").FigureCanvasTkAgg
+        for index, (title, kind, series) in enumerate(self.charts):
+            # Figure вместо plt.subplots: pyplot не хранит ссылки на фигуры, память не растет
+            fig = Figure(figsize=(8, 4))
+            ax = fig.add_subplot()
+            setup_axes(ax, title)
+            artists = []
+            for key, label, color in series:
+                if kind == "bar":
+                    artists.append(ax.bar([], [], label=label, color=color))
+                else:
+                    artists.append(ax.plot([], [], label=label, color=color)[0])
+            ax.legend()
+
+            if self.frame is None:
+                canvas = canvas_class(fig)
+            else:
+                canvas = canvas_class(fig, master=self.frame)
+                canvas.get_tk_widget().pack(fill="both", expand=True)
+                # animated: перекрестие и подсказка не попадают в обычную отрисовку, их рисует блиттинг
+                crosshair = ax.axvline(0, color="gray", linewidth=0.8, animated=True, visible=False)
+                tooltip = ax.annotate("", xy=(0, 0), xytext=(10, 10), textcoords="offset points", fontsize=9,
+                                      bbox={"boxstyle": "round", "fc": "white", "alpha": 0.9}, animated=True, visible=False)
+                self.hover.append((crosshair, tooltip))
+                canvas.mpl_connect("draw_event", lambda event, i=index: self.on_draw(i))
+                canvas.mpl_connect("resize_event", lambda event, i=index: self.on_resize(i))
+                canvas.mpl_connect("motion_notify_event", lambda event, i=index: self.on_hover(i, event))
+                canvas.mpl_connect("figure_leave_event", lambda event, i=index: self.on_hover(i, None))
+            # draw_idle рисует позже, поэтому замеряем саму отрисовку холста
+            canvas.draw = timed("chart.draw", chart=title)(canvas.draw)
+            self.figures.append(fig)
+            self.canvases.append(canvas)
+            self.artists.append(artists)
+
+    def update(self, block):
+        """Подставляет новые данные (ForecastSeries) в графики."""
+        if not self.figures:
+            self.build()
+        self.block = block
+        self.x = timed_import("matplotlib.dates").date2num(block.time)
+        self.backgrounds.clear()
+        for crosshair, tooltip in self.hover:
+            crosshair.set_visible(False)
+            tooltip.set_visible(False)
+        for index, (fig, canvas) in enumerate(zip(self.figures, self.canvases)):
+            ax = fig.axes[0]
+            self.set_chart_data(index)
+            # Скрытое перекрестие не должно растягивать ось времени до нуля
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+            fig.tight_layout()
+            canvas.draw_idle()
+
+    def set_chart_data(self, index):
+        """Подставляет в график index данные, прореженные до его ширины в пикселях."""
+        title, kind, series = self.charts[index]
+        ax = self.figures[index].axes[0]
+        artists = self.artists[index]
+        threshold = max(int(ax.bbox.width), MIN_CHART_POINTS)
+        for i, (key, label, color) in enumerate(series):
+            x, y = lttb(self.x, self.block[key], threshold)
+            if kind == "bar":
+                width = get_bar_width(x)
+                bars = artists[i]
+                if len(bars) == len(y):
+                    for bar, position, height in zip(bars, x, y):
+                        bar.set_x(position - width / 2)
+                        bar.set_width(width)
+                        bar.set_height(height)
+                else:
+                    bars.remove()
+                    artists[i] = ax.bar(x, y, width=width, label=label, color=color)
+            else:
+                artists[i].set_data(x, y)
+
+    def on_resize(self, index):
+        """При изменении размера холста заново прореживает данные под новую ширину."""
+        self.backgrounds.pop(index, None)
+        if self.block is not None:
+            self.set_chart_data(index)
+            self.figures[index].tight_layout()
+
+    def on_draw(self, index):
+        """После полной отрисовки запоминает картинку графика для блиттинга."""
+        canvas = self.canvases[index]
+        self.backgrounds[index] = canvas.copy_from_bbox(self.figures[index].bbox)
+
+    def on_hover(self, index, event):
+        """Рисует перекрестие и значения серий в ближайшей к курсору точке (event=None - убрать)."""
+        background = self.backgrounds.get(index)
+        if background is None or self.block is None:
+            return
+        fig = self.figures[index]
+        ax = fig.axes[0]
+        canvas = self.canvases[index]
+        crosshair, tooltip = self.hover[index]
+        canvas.restore_region(background)
+        if event is not None and event.inaxes is ax and event.xdata is not None and len(self.x):
+            # Ближайшая точка исходных (не прореженных) данных
+            i = int(np.clip(np.searchsorted(self.x, event.xdata), 1, len(self.x) - 1))
+            if event.xdata - self.x[i - 1] < self.x[i] - event.xdata:
+                i -= 1
+            title, kind, series = self.charts[index]
+            lines = [str(np.datetime_as_string(self.block.time[i], unit=self.block.time_unit)).replace("T", " ")]
+            lines += [f"{label}: {format_number(self.block[key][i])}" for key, label, color in series]
+            crosshair.set_xdata([self.x[i], self.x[i]])
+            tooltip.xy = (self.x[i], event.ydata)
+            tooltip.set_text("\n".join(lines))
+            # Справа подсказку показываем слева от курсора, чтобы она не уходила за край
+            right_half = event.x > fig.bbox.width / 2
+            tooltip.set_position((-10 if right_half else 10, 10))
+            tooltip.set_horizontalalignment("right" if right_half else "left")
+            crosshair.set_visible(True)
+            tooltip.set_visible(True)
+            ax.draw_artist(crosshair)
+            ax.draw_artist(tooltip)
+        else:
+            crosshair.set_visible(False)
+            tooltip.set_visible(False)
+        canvas.blit(fig.bbox)
+
+    def close(self):
+        """Удаляет холсты и освобождает фигуры."""
+        for fig, canvas in zip(self.figures, self.canvases):
+            if self.frame is not None:
+                canvas.get_tk_widget().destroy()
+            fig.clear()
+        self.figures = []
+        self.canvases = []
+        self.artists = []
+        self.hover = []
+        self.backgrounds.clear()
+
+
+class ImageChartPanel:
+    """Те же графики, что у ChartPanel, но отрисованные в пуле процессов и показанные картинками.
+
+    call_in_ui(callback, *args) передает готовые картинки в главный поток.
+    """
+
+    def __init__(self, frame, charts, call_in_ui):
+        self.frame = frame
+        self.charts = charts
+        self.call_in_ui = call_in_ui
+        self.labels = []
+        self.images = []  # CTkImage нужно хранить, иначе картинку удалит сборщик мусора
+        self.generation = 0  # Номер последнего обновления: картинки для старых данных не показываем
+
+    def build(self):
+        """Создает подписи-картинки для графиков (один раз)."""
+        ctk = timed_import("customtkinter")
+        for title, kind, series in self.charts:
+            label = ctk.CTkLabel(self.frame, text="⏳ Отрисовка...")
+            label.pack(fill="both", expand=True, pady=5)
+            self.labels.append(label)
+            self.images.append(None)
+
+    def get_image_size(self):
+        """Размер картинки по текущей ширине панели."""
+        width = self.frame.winfo_width() - IMAGE_PADDING
+        if width < MIN_IMAGE_WIDTH:
+            return DEFAULT_IMAGE_SIZE
+        return width, width // 2
+
+    def update(self, block):
+        """Отправляет графики с новыми данными (ForecastSeries) в пул процессов."""
+        if not self.labels:
+            self.build()
+        self.generation += 1
+        width, height = self.get_image_size()
+        start = time.perf_counter()
+        for index, future in enumerate(submit_charts(self.charts, block, width, height)):
+            future.add_done_callback(lambda done, i=index, generation=self.generation: self.on_rendered(done, i, generation, start))
+
+    def on_rendered(self, future, index, generation, start):
+        """Получает готовую картинку (вызывается в служебном потоке пула)."""
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Ошибка при отрисовке графика: {e}")
+            return
+        record_span("chart.render", (time.perf_counter() - start) * 1000, chart=self.charts[index][0], kind="process")
+        self.call_in_ui(self.show_image, index, generation, result)
+
+    def show_image(self, index, generation, result):
+        """Показывает картинку графика (вызывается в главном потоке)."""
+        if generation != self.generation or not self.labels:
+            return
+        ctk = timed_import("customtkinter")
+        Image = timed_import("PIL.Image")
+        width, height, data = result
+        image = Image.frombuffer("RGBA", (width, height), data, "raw", "RGBA", 0, 1)
+        # Картинка нарисована в пикселях экрана, а CTkImage сам умножает size на масштаб виджетов
+        scaling = self.labels[index]._get_widget_scaling()
+        self.images[index] = ctk.CTkImage(light_image=image, size=(round(width / scaling), round(height / scaling)))
+        self.labels[index].configure(image=self.images[index], text="")
+
+    def close(self):
+        """Удаляет картинки. Картинки, которые еще рисуются, будут отброшены."""
+        self.generation += 1
+        for label in self.labels:
+            label.destroy()
+        self.labels = []
+        self.images = []
@@ -0,0 +1,48 @@
+"""Консольный режим AI Weather: прогноз в формате JSON без графического интерфейса.
+
+Пример: python -m weather_cli Москва --days 3 --hourly --ai
+"""
+import sys
+import json
+import argparse
+import weather_core
+from weather_comfort import current_comfort, comfort_to_json
+
+
+def main(argv=None):
+    """Печатает прогноз для города в формате JSON. Возвращает код завершения."""
+    parser = argparse.ArgumentParser(prog="python -m weather_cli", description="Прогноз погоды AI Weather в формате JSON")
+    parser.add_argument("city", help="название города или координаты (\"55.75, 37.62\")")
+    parser.add_argument("--days", type=int, default=7, choices=range(1, 17), metavar="1-16", help="длительность прогноза в днях (по умолчанию 7)")
+    parser.add_argument("--hourly", action="store_true", help="добавить почасовой прогноз")
+    parser.add_argument("--ai", action="store_true", help="добавить оценку комфорта и рекомендацию от GigaChat")
+    args = parser.parse_args(argv)
+
+    try:
+        forecast = weather_core.get_forecast(args.city, args.days)
+    except Exception as e:
+        json.dump({"city": args.city, "error": str(e)}, sys.stdout, ensure_ascii=False)
+        print()
+        return 1
+
+    result = {"city": args.city}
+    if weather_core.parse_coordinates(args.city):
+        result["nearest_city"] = weather_core.find_nearest_city(forecast.latitude, forecast.longitude)
+    result.update(forecast.to_dict())
+    result["comfort_index"] = comfort_to_json(current_comfort(forecast.current))
+    if not args.hourly:
+        del result["hourly"]
+    if args.ai:
+        try:
+            result["comfort"] = weather_core.get_comfort_score(forecast.current)
+            result["recommendation"] = weather_core.get_recommendation(forecast.current)
+        except Exception as e:
+            result["ai_error"] = str(e)
+
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2, allow_nan=False)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Локальная оценка комфорта погоды от 1 до 10 без нейросети.
+
+Оценка считается по тем же переменным OpenMeteo (температура, влажность, ветер, осадки,
+облачность) через индекс жары, ветро-холодовой индекс, точку росы и humidex. Все функции
+работают с массивами NumPy, поэтому текущая погода, каждый час и каждый день считаются
+за один проход. Ветер OpenMeteo по умолчанию отдает в км/ч.
+"""
+import math
+import numpy as np
+
+IDEAL_TEMPERATURE = (18.0, 24.0)  # Диапазон ощущаемой температуры без штрафа, °C
+COLD_PENALTY_PER_DEGREE = 0.25
+COLD_MAX_PENALTY = 7.0
+HEAT_PENALTY_PER_DEGREE = 0.4
+HEAT_MAX_PENALTY = 7.0
+HUMIDEX_COMFORT_LIMIT = 30.0  # Выше humidex ощущается духота
+DEW_POINT_COMFORT_LIMIT = 16.0  # Выше точка росы ощущается влажной
+MUGGY_PENALTY_PER_DEGREE = 0.2
+RAIN_PENALTY = 0.5  # За сам факт осадков
+RAIN_PENALTY_PER_MM = 2.0  # За каждый мм в час
+RAIN_MAX_PENALTY = 3.0
+CLOUD_MAX_PENALTY = 1.0  # При сплошной облачности
+CALM_WIND_LIMIT = 25.0  # Ветер слабее не мешает, км/ч
+WIND_PENALTY_PER_KMH = 0.08
+WIND_MAX_PENALTY = 2.0
+
+# Для дней нет влажности и облачности: влажность берем типичную, облачность - по погодному коду
+DEFAULT_HUMIDITY = 60.0
+DAYLIGHT_HOURS = 12.0  # На сколько часов распределяется суточная сумма осадков
+DAILY_WIND_FACTOR = 0.7  # Средний ветер относительно суточного максимума
+
+# Насколько должна измениться погода, чтобы снова спрашивать нейросеть
+COMFORT_CHANGE_THRESHOLD = 1.0
+TEMPERATURE_CHANGE_THRESHOLD = 3.0
+
+
+def dew_point(temperature, humidity):
+    """Точка росы по формуле Магнуса, °C."""
+    humidity = np.clip(np.asarray(humidity, dtype=np.float32), 1, 100)
+    gamma = np.log(humidity / 100) + 17.62 * temperature / (243.12 + temperature)
+    return 243.12 * gamma / (17.62 - gamma)
+
+
+def heat_index(temperature, humidity):
+    """Индекс жары (формула Ротфуса), °C. Ниже 27°C равен температуре."""
+    t = np.asarray(temperature, dtype=np.float32) * 9 / 5 + 32
+    rh = np.asarray(humidity, dtype=np.float32)
+    index = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh - 6.83783e-3 * t * t
+             - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+    return np.where(temperature >= 27, (index - 32) * 5 / 9, temperature)
+
+
+def wind_chill(temperature, windspeed):
+    """Ветро-холодовой индекс, °C (ветер в км/ч). Выше 10°C или в штиль равен температуре."""
+    speed = np.power(np.maximum(windspeed, 0), 0.16)
+    index = 13.12 + 0.6215 * temperature - 11.37 * speed + 0.3965 * temperature * speed
+    return np.where((temperature <= 10) & (windspeed > 4.8), index, temperature)
+
+
+def humidex(temperature, dew):
+    """Humidex (канадский индекс духоты), °C."""
+    vapour_pressure = 6.11 * np.exp(5417.7530 * (1 / 273.16 - 1 / (273.15 + dew)))
+    return temperature + 0.5555 * (vapour_pressure - 10)
+
+
+def comfort_index(temperature, humidity, windspeed, precipitation, cloudcover):
+    """Оценка комфорта от 1 до 10 для массивов погодных переменных (осадки в мм/ч)."""
+    temperature = np.asarray(temperature, dtype=np.float32)
+    dew = dew_point(temperature, humidity)
+    low, high = IDEAL_TEMPERATURE
+
+    cold = np.minimum(np.maximum(low - wind_chill(temperature, windspeed), 0) * COLD_PENALTY_PER_DEGREE, COLD_MAX_PENALTY)
+    heat = np.minimum(np.maximum(heat_index(temperature, humidity) - high, 0) * HEAT_PENALTY_PER_DEGREE, HEAT_MAX_PENALTY)
+    muggy = (np.maximum(humidex(temperature, dew) - HUMIDEX_COMFORT_LIMIT, 0)
+             + np.maximum(dew - DEW_POINT_COMFORT_LIMIT, 0)) * MUGGY_PENALTY_PER_DEGREE
+    rain = np.where(precipitation > 0.1, np.minimum(RAIN_PENALTY + precipitation * RAIN_PENALTY_PER_MM, RAIN_MAX_PENALTY), 0)
+    cloud = np.asarray(cloudcover, dtype=np.float32) / 100 * CLOUD_MAX_PENALTY
+    wind = np.minimum(np.maximum(np.asarray(windspeed, dtype=np.float32) - CALM_WIND_LIMIT, 0) * WIND_PENALTY_PER_KMH, WIND_MAX_PENALTY)
+
+    # Жара и духота описывают одно ощущение, поэтому берем больший из штрафов
+    score = 10 - cold - np.maximum(heat, muggy) - rain - cloud - wind
+    return np.round(np.clip(score, 1, 10), 1).astype(np.float32)
+
+
+def current_comfort(current):
+    """Оценка комфорта текущей погоды (словарь переменных OpenMeteo)."""
+    return round(float(comfort_index(
+        current["temperature_2m"], current["relative_humidity_2m"], current["windspeed_10m"],
+        current["precipitation"], current["cloudcover"]
+    )), 1)
+
+
+def hourly_comfort(hourly):
+    """Оценки комфорта для каждого часа почасового прогноза (ForecastSeries)."""
+    return comfort_index(
+        hourly["temperature_2m"], hourly["relative_humidity_2m"], hourly["windspeed_10m"],
+        hourly["precipitation"], hourly["cloudcover"]
+    )
+
+
+def daily_comfort(daily):
+    """Оценки комфорта для каждого дня (по дневному максимуму температуры)."""
+    code = daily["weathercode"]
+    # Коды 0-3: ясно, малооблачно, облачно, пасмурно; остальные (туман, осадки) - пасмурно
+    cloudcover = np.where(code <= 3, code * 100 / 3, 100)
+    return comfort_index(
+        daily["temperature_2m_max"], DEFAULT_HUMIDITY, daily["windspeed_10m_max"] * DAILY_WIND_FACTOR,
+        daily["precipitation_sum"] / DAYLIGHT_HOURS, cloudcover
+    )
+
+
+def conditions_changed(previous, current):
+    """Изменилась ли текущая погода настолько, что оценку нейросети стоит запросить заново."""
+    comfort_delta = abs(current_comfort(previous) - current_comfort(current))
+    temperature_delta = abs(previous["apparent_temperature"] - current["apparent_temperature"])
+    rain_changed = (previous["precipitation"] > 0.1) != (current["precipitation"] > 0.1)
+    # Сравнения с NaN ложны, поэтому пропуски в данных считаются изменением
+    return not (comfort_delta < COMFORT_CHANGE_THRESHOLD and temperature_delta < TEMPERATURE_CHANGE_THRESHOLD) or rain_changed
+
+
+def comfort_to_json(score):
+    """Оценка для JSON: число или None для пропуска (NaN в JSON не допускается)."""
+    return None if math.isnan(score) else score
+
+
+def format_comfort(score):
+    """Оценка для подписи: "7.5" или "--" для пропуска."""
+    return "--" if math.isnan(score) else f"{score:.1f}"
@@ -0,0 +1,890 @@
+"""Ядро AI Weather без графического интерфейса: геокодирование, прогноз OpenMeteo и запросы к GigaChat.
+
+Модуль не импортирует Tk, customtkinter и matplotlib. Тяжелые зависимости (openmeteo_requests,
+requests_cache, geopy, gigachat) загружаются при первом обращении, поэтому импорт быстрый.
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import math
+import importlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+import numpy as np
+from weather_metrics import span, record_span
+
+# конфиги и апи ключ
+# Адреса сервисов и папку кэша можно переопределить переменными окружения
+# (например, чтобы weather_bench работал с локальными заглушками)
+CACHE_DIR = os.environ.get("AI_WEATHER_CACHE_DIR", os.path.expanduser('~/.cache'))
+CACHE_PATH = os.path.join(CACHE_DIR, 'weather_cache')
+SETTINGS_PATH = os.path.join(CACHE_DIR, 'settings.json')
+GEOCODE_CACHE_PATH = os.path.join(CACHE_DIR, 'geocode_cache.json')
+GEOCODE_CACHE_TTL = 30 * 24 * 3600  # Координаты городов меняются редко, храним 30 дней
+GEOCODE_CACHE_SIZE = 500
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, 'llm_cache.json')
+LLM_CACHE_TTL = 7 * 24 * 3600
+LLM_CACHE_SIZE = 1000
+# Последний полученный прогноз и ответы нейросети по каждому городу: показываются сразу
+# при выборе города, пока идет обновление, и остаются на экране без сети.
+# Прогнозы большие, поэтому каждый лежит в своем файле; ответы - в одном небольшом файле.
+LAST_FORECASTS_DIR = os.path.join(CACHE_DIR, 'last_forecasts')
+LAST_ANSWERS_PATH = os.path.join(CACHE_DIR, 'last_answers.json')
+LAST_FORECASTS_TTL = 7 * 24 * 3600
+LAST_FORECASTS_SIZE = 20
+GIGA_CREDENTIALS = os.environ.get("GIGACHAT_CREDENTIALS", " ключ GIGA")
+GIGA_MODEL = os.environ.get("GIGACHAT_MODEL", "GigaChat")
+GIGA_MAX_CONNECTIONS = 4  # Соединений с GigaChat в пуле (keep-alive)
+# Таймауты запросов в секундах: зависший запрос не держит фоновый поток (и выход из программы) бесконечно
+GIGA_TIMEOUT = 30
+OPENMETEO_TIMEOUT = (3, 10)  # На соединение и на ожидание ответа
+OPENMETEO_READ_RETRIES = 1  # Сервер, который не отвечает, спрашиваем повторно только один раз
+NOMINATIM_TIMEOUT = 5
+
+# Запросы к нейросети. PROMPT_VERSION нужно увеличивать при изменении текстов,
+# чтобы не показывать ответы на старые формулировки из кэша.
+PROMPT_VERSION = 1
+PROMPTS = {
+    "comfort": "Оцени комфорт погоды от 1 до 10, где 1 - ужасно, 10 - отлично. Ответ должен содержать только число. Погода: {weather_info}",
+    "recommendation": "Как одеться по погоде: {weather_info}"
+}
+
+# Город можно задать координатами: "55.75, 37.62"
+COORDINATES_PATTERN = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*[,;\s]\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+# Переменные, которые запрашиваются у OpenMeteo одним запросом
+FORECAST_URL = os.environ.get("AI_WEATHER_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+NOMINATIM_URL = os.environ.get("AI_WEATHER_NOMINATIM_URL", "https://nominatim.openstreetmap.org")
+CURRENT_VARIABLES = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "precipitation", "windspeed_10m", "winddirection_10m", "cloudcover", "weathercode"]
+HOURLY_VARIABLES = ["temperature_2m", "relative_humidity_2m", "precipitation", "cloudcover", "windspeed_10m", "visibility", "weathercode", "soil_temperature_0cm", "soil_temperature_6cm", "soil_temperature_18cm", "soil_temperature_54cm"]
+DAILY_VARIABLES = ["weathercode", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max", "apparent_temperature_min", "precipitation_sum", "precipitation_probability_max", "windspeed_10m_max", "winddirection_10m_dominant", "sunrise", "sunset", "uv_index_max"]
+DAILY_TIME_VARIABLES = ["sunrise", "sunset"]
+# Прогнозы с другим набором переменных хранятся отдельно
+FORECAST_VARIABLES_KEY = (tuple(CURRENT_VARIABLES), tuple(HOURLY_VARIABLES), tuple(DAILY_VARIABLES))
+# Прогноз всегда запрашивается на максимальный срок OpenMeteo, а более короткие сроки
+# вырезаются из него без сети. В памяти хранятся прогнозы для FORECAST_STORE_SIZE точек.
+MAX_FORECAST_DAYS = 16
+FORECAST_STORE_SIZE = 50
+
+# Время жизни кэша для адресов OpenMeteo: число секунд или функция, возвращающая его.
+# Прогноз обновляется раз в час, поэтому держим его в кэше до начала следующего часа.
+DEFAULT_CACHE_EXPIRE = 3600
+
+# Создаем папку для  погоды и нейросети
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+def seconds_until_next_hour():
+    """Возвращает число секунд до начала следующего часа."""
+    return 3600 - int(time.time()) % 3600
+
+
+CACHE_POLICIES = {
+    FORECAST_URL: seconds_until_next_hour
+}
+
+
+def get_cache_expire_after(url):
+    """Возвращает время жизни кэша для адреса по таблице CACHE_POLICIES."""
+    for prefix, expire_after in CACHE_POLICIES.items():
+        if url.startswith(prefix):
+            return expire_after() if callable(expire_after) else expire_after
+    return DEFAULT_CACHE_EXPIRE
+
+
+# Транслитерация для ключей кэша: "Москва" и "Moskva" дают один ключ
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya"
+}
+
+
+def normalize_city_name(city_name):
+    """Приводит название города к ключу кэша: регистр, пробелы, ё/е, транслитерация."""
+    name = city_name.lower().replace("ё", "е")
+    name = "".join(TRANSLIT.get(char, char) for char in name)
+    # Убираем диакритику у латиницы (Zürich -> zurich)
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    name = "".join(char if char.isalnum() else " " for char in name)
+    return " ".join(name.split())
+
+
+class CityNotFoundError(ValueError):
+    """Город не найден ни в кэше и справочнике, ни у Nominatim."""
+
+
+class DiskCache:
+    """JSON-кэш на диске с временем жизни записей и вытеснением давно не используемых."""
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()  # Кэшем пользуются фоновые потоки
+        self.load()
+
+    def load(self):
+        """Загружает записи из файла, если он существует."""
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = OrderedDict(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Не удалось прочитать кэш {self.path}: {e}")
+                self.entries = OrderedDict()
+
+    def save(self):
+        """Сохраняет записи в файл (через временный файл, чтобы не испортить кэш)."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        """Возвращает значение по ключу или None, если записи нет или она устарела."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["time"] > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry["value"]
+
+    def set(self, key, value):
+        """Сохраняет значение и вытесняет самые давно использованные записи."""
+        with self.lock:
+            self.entries[key] = {"value": value, "time": time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.save()
+
+
+class FileCache:
+    """Кэш на диске, где каждая запись - отдельный JSON-файл.
+
+    Запись читается и сохраняется без остальных, поэтому подходит для больших значений.
+    """
+
+    def __init__(self, directory, ttl, max_entries):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get_path(self, key):
+        """Файл записи (имя - хэш ключа, ключ может содержать любые символы)."""
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        """Возвращает значение по ключу или None, если записи нет или она устарела."""
+        path = self.get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Не удалось прочитать кэш {path}: {e}")
+            return None
+        if time.time() - entry["time"] > self.ttl:
+            return None
+        return entry["value"]
+
+    def set(self, key, value):
+        """Сохраняет значение и удаляет самые старые записи сверх max_entries."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.get_path(key)
+        # У каждого потока свой временный файл, файл записи заменяется целиком
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "time": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Удаляет самые давно сохраненные записи сверх max_entries."""
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        if len(paths) <= self.max_entries:
+            return
+        for path in sorted(paths, key=os.path.getmtime)[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ForecastSeries:
+    """Переменные прогноза на общей оси времени: по одному массиву на переменную.
+
+    time - местное время (datetime64[s]), значения - float32, NaN для пропусков.
+    Переменные-моменты времени (восход, закат) хранятся как datetime64[s].
+    """
+    __slots__ = ("time", "values", "time_unit")
+
+    def __init__(self, time, values, time_unit):
+        self.time = time
+        self.values = values
+        self.time_unit = time_unit  # "D" для дневных данных, "m" для почасовых
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def __len__(self):
+        return len(self.time)
+
+    def head(self, count):
+        """Возвращает первые count точек (без копирования массивов)."""
+        return ForecastSeries(self.time[:count], {name: values[:count] for name, values in self.values.items()}, self.time_unit)
+
+    def time_labels(self):
+        """Подписи оси времени: "2024-01-31" или "2024-01-31T15:00"."""
+        return np.datetime_as_string(self.time, unit=self.time_unit)
+
+    def to_dict(self):
+        """Переводит данные в словарь списков для JSON (пропуски становятся None)."""
+        result = {"time": self.time_labels().tolist()}
+        for name, values in self.values.items():
+            if values.dtype.kind == "M":
+                labels = np.datetime_as_string(values, unit="m").tolist()
+                result[name] = [None if missing else label for label, missing in zip(labels, np.isnat(values).tolist())]
+            else:
+                result[name] = [None if math.isnan(value) else round(value, 1) for value in values.tolist()]
+        return result
+
+    @classmethod
+    def from_dict(cls, data, time_unit):
+        """Восстанавливает данные из словаря, полученного от to_dict."""
+        values = {}
+        for name, column in data.items():
+            if name == "time":
+                continue
+            if name in DAILY_TIME_VARIABLES:
+                values[name] = np.array(column, dtype="datetime64[s]")
+            else:
+                values[name] = np.array([np.nan if value is None else value for value in column], dtype=np.float32)
+        return cls(np.array(data["time"], dtype="datetime64[s]"), values, time_unit)
+
+
+def current_to_dict(current):
+    """Текущая погода для JSON (пропуски становятся None)."""
+    return {name: None if math.isnan(value) else round(value, 1) for name, value in current.items()}
+
+
+def current_from_dict(data):
+    """Текущая погода из словаря, полученного от current_to_dict."""
+    return {name: math.nan if value is None else value for name, value in data.items()}
+
+
+class Forecast:
+    """Прогноз для одной точки: текущая погода, прогноз по дням и почасовой прогноз."""
+    __slots__ = ("latitude", "longitude", "utc_offset", "current", "daily", "hourly")
+
+    def __init__(self, latitude, longitude, utc_offset, current, daily, hourly):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.utc_offset = utc_offset
+        self.current = current  # Словарь переменная -> число
+        self.daily = daily
+        self.hourly = hourly
+
+    def to_dict(self):
+        """Переводит прогноз в словарь для JSON."""
+        return {
+            "latitude": round(self.latitude, 4),
+            "longitude": round(self.longitude, 4),
+            "utc_offset": self.utc_offset,
+            "current": current_to_dict(self.current),
+            "daily": self.daily.to_dict(),
+            "hourly": self.hourly.to_dict()
+        }
+
+    def head(self, days):
+        """Возвращает прогноз на первые days дней (почасовой прогноз на те же дни)."""
+        return Forecast(self.latitude, self.longitude, self.utc_offset, self.current, self.daily.head(days), self.hourly.head(days * 24))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает прогноз из словаря, полученного от to_dict."""
+        return cls(
+            data["latitude"], data["longitude"], data["utc_offset"], current_from_dict(data["current"]),
+            ForecastSeries.from_dict(data["daily"], "D"),
+            ForecastSeries.from_dict(data["hourly"], "m")
+        )
+
+
+class ForecastStore:
+    """Прогнозы на MAX_FORECAST_DAYS дней в памяти, по ключу (координаты, набор переменных).
+
+    Прогноз на любой меньший срок вырезается из сохраненного, поэтому смена длительности
+    прогноза не требует запросов к OpenMeteo. Записи живут до начала следующего часа, когда
+    OpenMeteo обновляет прогноз, а у другого города другие координаты и своя запись.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # Ключ -> (время истечения, Forecast)
+        self.lock = threading.Lock()  # Прогнозы запрашиваются из фоновых потоков
+
+    @staticmethod
+    def make_key(coordinates):
+        """Ключ записи: округленные координаты и набор запрашиваемых переменных."""
+        latitude, longitude = coordinates
+        return round(latitude, 4), round(longitude, 4), FORECAST_VARIABLES_KEY
+
+    def get(self, coordinates):
+        """Возвращает сохраненный прогноз на MAX_FORECAST_DAYS дней или None."""
+        key = self.make_key(coordinates)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, coordinates, forecast):
+        """Сохраняет прогноз до начала следующего часа."""
+        with self.lock:
+            key = self.make_key(coordinates)
+            self.entries[key] = (time.time() + seconds_until_next_hour(), forecast)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Удаляет все сохраненные прогнозы."""
+        with self.lock:
+            self.entries.clear()
+
+
+# Сколько миллисекунд занял импорт тяжелых модулей (отчет о запуске, как у python -X importtime)
+IMPORT_TIMES = {}
+
+
+def timed_import(name):
+    """Импортирует модуль и запоминает, сколько это заняло."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = (time.perf_counter() - start) * 1000
+    return module
+
+
+def import_report():
+    """Возвращает времена импорта тяжелых модулей, от самых медленных."""
+    return dict(sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True))
+
+
+# Клиенты и кэши создаются при первом обращении, чтобы импорт модуля был быстрым
+_init_lock = threading.Lock()
+_openmeteo = None
+_openmeteo_session = None  # Сессия клиента OpenMeteo, закрывается в close_clients
+_geocode = None
+_geocode_cache = None
+_llm_cache = None
+_last_forecasts = None
+_last_answers = None
+_giga = None
+_forecast_store = None
+_last_answers_lock = threading.Lock()  # Ответы нейросети сохраняются из разных потоков
+
+
+def make_cache_session():
+    """Создает кэширующую сессию, которая берет время жизни ответа из CACHE_POLICIES."""
+    requests_cache = timed_import("requests_cache")
+
+    class WeatherSession(requests_cache.CachedSession):
+        def request(self, method, url, *args, expire_after=None, **kwargs):
+            if expire_after is None:
+                expire_after = get_cache_expire_after(url)
+            with span("http", url=url.split("?")[0]) as attributes:
+                response = super().request(method, url, *args, expire_after=expire_after, **kwargs)
+                attributes["cache"] = "hit" if getattr(response, "from_cache", False) else "miss"
+                attributes["status"] = response.status_code
+            return response
+
+    return WeatherSession(CACHE_PATH, expire_after=DEFAULT_CACHE_EXPIRE)
+
+
+def get_openmeteo():
+    """Возвращает клиент OpenMeteo: одна сессия с пулом соединений (keep-alive), кэшем и повторами."""
+    global _openmeteo, _openmeteo_session
+    with _init_lock:
+        if _openmeteo is None:
+            openmeteo_requests = timed_import("openmeteo_requests")
+            retry_requests = timed_import("retry_requests")
+            _openmeteo_session = retry_requests.retry(make_cache_session(), retries=5, backoff_factor=0.2)
+            for adapter in _openmeteo_session.adapters.values():
+                adapter.max_retries = adapter.max_retries.new(read=OPENMETEO_READ_RETRIES)
+            _openmeteo = openmeteo_requests.Client(session=_openmeteo_session)
+        return _openmeteo
+
+
+def get_geocode_cache():
+    """Возвращает кэш координат городов."""
+    global _geocode_cache
+    with _init_lock:
+        if _geocode_cache is None:
+            _geocode_cache = DiskCache(GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL, GEOCODE_CACHE_SIZE)
+        return _geocode_cache
+
+
+def get_llm_cache():
+    """Возвращает кэш ответов нейросети."""
+    global _llm_cache
+    with _init_lock:
+        if _llm_cache is None:
+            _llm_cache = DiskCache(LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_SIZE)
+        return _llm_cache
+
+
+def get_last_forecasts():
+    """Возвращает хранилище последних прогнозов по городам (файл на город)."""
+    global _last_forecasts
+    with _init_lock:
+        if _last_forecasts is None:
+            _last_forecasts = FileCache(LAST_FORECASTS_DIR, LAST_FORECASTS_TTL, LAST_FORECASTS_SIZE)
+        return _last_forecasts
+
+
+def get_last_answers():
+    """Возвращает хранилище последних ответов нейросети по городам."""
+    global _last_answers
+    with _init_lock:
+        if _last_answers is None:
+            _last_answers = DiskCache(LAST_ANSWERS_PATH, LAST_FORECASTS_TTL, LAST_FORECASTS_SIZE)
+        return _last_answers
+
+
+def get_forecast_store():
+    """Возвращает хранилище прогнозов в памяти."""
+    global _forecast_store
+    with _init_lock:
+        if _forecast_store is None:
+            _forecast_store = ForecastStore(FORECAST_STORE_SIZE)
+        return _forecast_store
+
+
+def get_geocoder():
+    """Возвращает функцию геокодирования Nominatim (не больше 1 запроса в секунду)."""
+    global _geocode
+    with _init_lock:
+        if _geocode is None:
+            geocoders = timed_import("geopy.geocoders")
+            rate_limiter = timed_import("geopy.extra.rate_limiter")
+            scheme, _, domain = NOMINATIM_URL.partition("://")
+            geolocator = geocoders.Nominatim(user_agent="weather_app", domain=domain, scheme=scheme, timeout=NOMINATIM_TIMEOUT)
+            _geocode = rate_limiter.RateLimiter(geolocator.geocode, min_delay_seconds=1)
+        return _geocode
+
+
+def get_giga():
+    """Возвращает общий клиент GigaChat.
+
+    Клиент живет все время работы программы: токен доступа запрашивается один раз и
+    переиспользуется, пока до его истечения больше минуты, соединения остаются открытыми
+    между запросами.
+    Клиент можно вызывать из разных потоков.
+    """
+    global _giga
+    with _init_lock:
+        if _giga is None:
+            gigachat = timed_import("gigachat")
+            _giga = gigachat.GigaChat(
+                credentials=GIGA_CREDENTIALS, model=GIGA_MODEL, verify_ssl_certs=False, max_connections=GIGA_MAX_CONNECTIONS,
+                timeout=GIGA_TIMEOUT
+            )
+        return _giga
+
+
+def close_clients():
+    """Закрывает соединения клиентов GigaChat и OpenMeteo (вызывать при выходе)."""
+    global _giga, _openmeteo, _openmeteo_session
+    with _init_lock:
+        giga, _giga = _giga, None
+        session, _openmeteo_session = _openmeteo_session, None
+        _openmeteo = None
+    try:
+        if giga is not None:
+            giga.close()
+        if session is not None:
+            session.close()
+    except Exception as e:
+        print(f"Ошибка при закрытии соединений: {e}")
+
+
+def warm_up():
+    """Заранее загружает тяжелые модули и создает клиентов (вызывать в фоновом потоке)."""
+    get_openmeteo()
+    get_geocoder()
+    get_geocode_cache()
+    get_llm_cache()
+    get_last_answers()
+    get_giga()
+    timed_import("weather_places").get_gazetteer()
+
+
+def get_cached_coordinates(city_name):
+    """Возвращает координаты города из кэша или None (без запроса к Nominatim)."""
+    cached = get_geocode_cache().get(normalize_city_name(city_name))
+    return tuple(cached) if cached else None
+
+
+def parse_coordinates(text):
+    """Координаты, введенные числами ("55.75, 37.62"), или None."""
+    match = COORDINATES_PATTERN.match(text)
+    if not match:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+        return latitude, longitude
+    return None
+
+
+def find_city(city_name):
+    """Город из встроенного справочника (weather_places.Place) или None."""
+    try:
+        return timed_import("weather_places").get_gazetteer().lookup(city_name)
+    except Exception as e:
+        print(f"Ошибка справочника городов: {e}")
+        return None
+
+
+def find_nearest_city(latitude, longitude):
+    """Название ближайшего города из встроенного справочника или None."""
+    try:
+        nearest = timed_import("weather_places").get_gazetteer().nearest(latitude, longitude)
+    except Exception as e:
+        print(f"Ошибка справочника городов: {e}")
+        return None
+    return nearest[0].name if nearest else None
+
+
+def get_local_coordinates(city_name):
+    """Координаты без сети: из кэша, из введенных чисел или из справочника. (координаты, источник) или None."""
+    cached = get_cached_coordinates(city_name)
+    if cached:
+        return cached, "hit"
+    parsed = parse_coordinates(city_name)
+    if parsed:
+        return parsed, "coordinates"
+    place = find_city(city_name)
+    if place:
+        return (place.latitude, place.longitude), "gazetteer"
+    return None
+
+
+def get_coordinates(city_name):
+    """Получает координаты города по его названию (без сети, если это возможно, иначе у Nominatim)."""
+    with span("geocode", cache="hit") as attributes:
+        local = get_local_coordinates(city_name)
+        if local:
+            attributes["cache"] = local[1]
+            return local[0]
+        attributes["cache"] = "miss"
+        location = get_geocoder()(city_name)
+    if location:
+        get_geocode_cache().set(normalize_city_name(city_name), [location.latitude, location.longitude])
+        return location.latitude, location.longitude
+    else:
+        raise CityNotFoundError(f"Не удалось найти город {city_name}")
+
+
+def remember_coordinates(city_name, latitude, longitude):
+    """Сохраняет известные координаты города, чтобы не спрашивать их у Nominatim."""
+    get_geocode_cache().set(normalize_city_name(city_name), [latitude, longitude])
+
+
+def request_forecasts(coordinates, forecast_days, refresh=False):
+    """Запрашивает у OpenMeteo прогнозы для нескольких точек (ответы без разбора).
+
+    refresh=True - запрос идет в сеть, даже если ответ есть в кэше HTTP.
+    """
+    # OpenMeteo принимает списки координат через запятую и возвращает ответы в том же порядке
+    params = {
+        "latitude": ",".join(str(latitude) for latitude, longitude in coordinates),
+        "longitude": ",".join(str(longitude) for latitude, longitude in coordinates),
+        "current": CURRENT_VARIABLES,
+        "hourly": HOURLY_VARIABLES,
+        "daily": DAILY_VARIABLES,
+        "timezone": "auto",
+        "forecast_days": forecast_days
+    }
+    return get_openmeteo().weather_api(FORECAST_URL, params=params, timeout=OPENMETEO_TIMEOUT, force_refresh=refresh)
+
+
+def fetch_forecasts(coordinates, forecast_days, refresh=False):
+    """Возвращает прогнозы для нескольких точек на forecast_days дней.
+
+    Прогнозы берутся из хранилища, а недостающие загружаются на MAX_FORECAST_DAYS дней
+    одним запросом к OpenMeteo и сохраняются. refresh=True (кнопка "Обновить") загружает
+    все прогнозы заново, мимо хранилища и кэша HTTP.
+    """
+    store = get_forecast_store()
+    forecasts = [None if refresh else store.get(point) for point in coordinates]
+    missing = [point for point, forecast in zip(coordinates, forecasts) if forecast is None]
+    if missing:
+        responses = request_forecasts(missing, MAX_FORECAST_DAYS, refresh)
+        loaded = iter([decode_forecast_response(response) for response in responses])
+        for i, forecast in enumerate(forecasts):
+            if forecast is None:
+                forecasts[i] = next(loaded)
+                store.set(coordinates[i], forecasts[i])
+    return [forecast.head(forecast_days) for forecast in forecasts]
+
+
+def get_forecast(city_name, days=7):
+    """Возвращает прогноз (Forecast) для города на days дней."""
+    return fetch_forecasts([get_coordinates(city_name)], days)[0]
+
+
+def save_last_forecast(city_name, forecast):
+    """Запоминает последний полученный прогноз для города.
+
+    Ответы нейросети хранятся отдельно: при каждом записана погода, для которой он получен.
+    """
+    get_last_forecasts().set(normalize_city_name(city_name), {"forecast": forecast.to_dict(), "time": time.time()})
+
+
+def save_last_answer(city_name, kind, answer, current):
+    """Запоминает последний ответ нейросети (kind из PROMPTS) для города и погоду current, для которой он получен."""
+    key = normalize_city_name(city_name)
+    last_answers = get_last_answers()
+    with _last_answers_lock:
+        answers = dict(last_answers.get(key) or {}, **{kind: {"text": answer, "current": current_to_dict(current)}})
+        last_answers.set(key, answers)
+
+
+def load_last_forecast(city_name):
+    """Возвращает (прогноз, ответы нейросети, время получения) последнего прогноза или None.
+
+    Читает файл с диска, поэтому вызывать в фоновом потоке.
+    Ответы - словарь kind -> (текст, текущая погода, для которой он получен).
+    """
+    key = normalize_city_name(city_name)
+    entry = get_last_forecasts().get(key)
+    if not entry:
+        return None
+    saved_answers = get_last_answers().get(key) or {}
+    answers = {kind: (answer["text"], current_from_dict(answer["current"])) for kind, answer in saved_answers.items() if kind in PROMPTS}
+    return Forecast.from_dict(entry["forecast"]), answers, entry["time"]
+
+
+def decode_forecast_response(response):
+    """Раскладывает ответ OpenMeteo на текущую погоду, прогноз по дням и почасовой прогноз."""
+    with span("decode"):
+        return decode_forecast_blocks(response)
+
+
+def decode_forecast_blocks(response):
+    """Разбор ответа OpenMeteo (без замера времени)."""
+    utc_offset = response.UtcOffsetSeconds()
+
+    current_block = response.Current()
+    current = {name: current_block.Variables(i).Value() for i, name in enumerate(CURRENT_VARIABLES)}
+
+    daily_block = response.Daily()
+    daily_values = {}
+    for i, name in enumerate(DAILY_VARIABLES):
+        variable = daily_block.Variables(i)
+        if name in DAILY_TIME_VARIABLES:
+            daily_values[name] = to_local_time(variable.ValuesInt64AsNumpy(), utc_offset)
+        else:
+            daily_values[name] = variable.ValuesAsNumpy().astype(np.float32)
+    daily = ForecastSeries(decode_time_axis(daily_block, utc_offset), daily_values, "D")
+
+    hourly_block = response.Hourly()
+    hourly_values = {name: hourly_block.Variables(i).ValuesAsNumpy().astype(np.float32) for i, name in enumerate(HOURLY_VARIABLES)}
+    hourly = ForecastSeries(decode_time_axis(hourly_block, utc_offset), hourly_values, "m")
+
+    return Forecast(response.Latitude(), response.Longitude(), utc_offset, current, daily, hourly)
+
+
+def decode_time_axis(block, utc_offset):
+    """Строит ось местного времени для блока daily/hourly."""
+    return to_local_time(np.arange(block.Time(), block.TimeEnd(), block.Interval(), dtype=np.int64), utc_offset)
+
+
+def to_local_time(timestamps, utc_offset):
+    """Переводит массив unix-времени в datetime64 местного времени."""
+    return (timestamps + utc_offset).astype("datetime64[s]")
+
+
+def format_number(value):
+    """Форматирует значение прогноза для отображения ("--" для пропусков)."""
+    if math.isnan(value):
+        return "--"
+    return str(round(float(value), 1))
+
+
+def get_wind_direction(degrees):
+    """Преобразует градусы в направление ветра."""
+    directions = [
+        "Север", "Северо-северо-восток", "Северо-восток", "Востоко-северо-восток",
+        "Восток", "Востоко-юго-восток", "Юго-восток", "Юго-юго-восток",
+        "Юг", "Юго-юго-запад", "Юго-запад", "Западо-юго-запад",
+        "Запад", "Западо-северо-запад", "Северо-запад", "Северо-северо-запад"
+    ]
+    if math.isnan(degrees):
+        return "--"
+    index = round(degrees / 22.5) % 16
+    return directions[index]
+
+
+def calculate_daylight_duration(daylight):
+    """Форматирует продолжительность светового дня (numpy timedelta64)."""
+    return str(timedelta(seconds=int(daylight / np.timedelta64(1, "s"))))
+
+
+def get_weathercode_description(code):
+    """Возвращает описание погодного кода на русском."""
+    weathercode_descriptions = {
+        0: "Ясно",
+        1: "Преимущественно ясно",
+        2: "Переменная облачность",
+        3: "Пасмурно",
+        45: "Туман",
+        48: "Туман с инеем",
+        51: "Морось: легкая",
+        53: "Морось: умеренная",
+        55: "Морось: сильная",
+        56: "Ледяная морось: легкая",
+        57: "Ледяная морось: сильная",
+        61: "Дождь: легкий",
+        63: "Дождь: умеренный",
+        65: "Дождь: сильный",
+        66: "Ледяной дождь: легкий",
+        67: "Ледяной дождь: сильный",
+        71: "Снег: легкий",
+        73: "Снег: умеренный",
+        75: "Снег: сильный",
+        77: "Снежные зерна",
+        80: "Ливень: легкий",
+        81: "Ливень: умеренный",
+        82: "Ливень: сильный",
+        85: "Снегопад: легкий",
+        86: "Снегопад: сильный",
+        95: "Гроза: легкая или умеренная",
+        96: "Гроза с градом: легкая",
+        99: "Гроза с градом: сильная"
+    }
+    return weathercode_descriptions.get(code, "Неизвестно")
+
+
+def format_current_weather(current):
+    """Строки для панели текущей погоды."""
+    return [
+        f"🌡️ Текущая температура: {int(current['temperature_2m'])}°C",
+        f"🌡️ Температура по ощущениям: {int(current['apparent_temperature'])}°C",
+        f"💧 Относительная влажность: {int(current['relative_humidity_2m'])}%",
+        f"🌧️ Текущие осадки: {int(current['precipitation'])} мм",
+        f"💨 Скорость ветра: {int(current['windspeed_10m'])} м/с",
+        f"🧭 Направление ветра: {get_wind_direction(current['winddirection_10m'])}",
+        f"☁️ Общий уровень облачности: {int(current['cloudcover'])}%",
+        f"🌤️ Погодный код: {get_weathercode_description(current['weathercode'])}"
+    ]
+
+
+def build_weather_info(current):
+    """Собирает описание текущей погоды для запросов к нейросети."""
+    wind_direction = get_wind_direction(current["winddirection_10m"])
+    return f"Текущие осадки: {int(current['precipitation'])} мм, Текущая температура: {int(current['temperature_2m'])}°C, Температура по ощущениям: {int(current['apparent_temperature'])}°C, Текущая относительная влажность воздуха: {int(current['relative_humidity_2m'])}%, Скорость ветра: {int(current['windspeed_10m'])} м/с, Направление ветра: {wind_direction}, Общий уровень облачности: {int(current['cloudcover'])}%"
+
+
+def weather_cache_key(current):
+    """Строит ключ кэша ответов нейросети по округленным погодным условиям."""
+    return "|".join([
+        f"v{PROMPT_VERSION}",
+        f"t{int(current['temperature_2m'])}",
+        f"a{int(current['apparent_temperature'])}",
+        f"h{int(current['relative_humidity_2m']) // 10 * 10}",
+        f"p{int(current['precipitation'])}",
+        f"w{int(current['windspeed_10m'])}",
+        f"d{get_wind_direction(current['winddirection_10m'])}",
+        f"c{int(current['cloudcover']) // 10 * 10}"
+    ])
+
+
+def ask_giga(prompt):
+    """Отправляет запрос в GigaChat и возвращает текст ответа."""
+    giga = get_giga()
+    with span("gigachat"):
+        response = giga.chat(prompt)
+    return response.choices[0].message.content
+
+
+def stream_giga(prompt):
+    """Отдает ответ GigaChat по частям по мере генерации.
+
+    Если перестать читать генератор (и закрыть его), соединение с GigaChat закрывается.
+    """
+    giga = get_giga()
+    start = time.perf_counter()
+    first_chunk = True
+    with span("gigachat", kind="stream"):
+        for chunk in giga.stream(prompt):
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                if first_chunk:
+                    record_span("gigachat.first_token", (time.perf_counter() - start) * 1000)
+                    first_chunk = False
+                yield content
+
+
+def get_cached_answer(kind, current):
+    """Возвращает ответ нейросети из кэша или None (без запроса к GigaChat)."""
+    return get_llm_cache().get(f"{kind}|{weather_cache_key(current)}")
+
+
+def ask_giga_cached(kind, current):
+    """Возвращает ответ нейросети из кэша или запрашивает его у GigaChat."""
+    with span("llm", kind=kind, cache="hit") as attributes:
+        answer = get_cached_answer(kind, current)
+        if answer is None:
+            attributes["cache"] = "miss"
+            answer = ask_giga(PROMPTS[kind].format(weather_info=build_weather_info(current)))
+            get_llm_cache().set(f"{kind}|{weather_cache_key(current)}", answer)
+    return answer
+
+
+def stream_answer(kind, current):
+    """Как ask_giga_cached, но отдает ответ по частям. В кэш попадает только полный ответ."""
+    answer = get_cached_answer(kind, current)
+    if answer is not None:
+        yield answer
+        return
+    parts = []
+    for chunk in stream_giga(PROMPTS[kind].format(weather_info=build_weather_info(current))):
+        parts.append(chunk)
+        yield chunk
+    get_llm_cache().set(f"{kind}|{weather_cache_key(current)}", "".join(parts))
+
+
+def get_comfort_score(current):
+    """Возвращает оценку комфорта погоды от 1 до 10 по мнению GigaChat."""
+    return ask_giga_cached("comfort", current)
+
+
+def get_recommendation(current):
+    """Возвращает рекомендацию GigaChat, как одеться по погоде."""
+    return ask_giga_cached("recommendation", current)
+
+
+def stream_recommendation(current):
+    """Отдает рекомендацию GigaChat, как одеться по погоде, по частям."""
+    return stream_answer("recommendation", current)
@@ -0,0 +1,122 @@
+"""Замеры времени этапов AI Weather: геокодирование, HTTP-запросы, разбор ответов, GigaChat, отрисовка.
+
+Пример:
+    with span("geocode", city="Москва") as attributes:
+        ...
+        attributes["cache"] = "hit"
+
+Последние замеры хранятся в памяти (для панели в настройках), сводка по этапам копится
+за все время работы и выгружается в формате JSON lines или Prometheus.
+"""
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 1000  # Последних замеров в памяти
+# Границы корзин гистограммы Prometheus, мс
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+# Атрибуты замера, которые становятся метками Prometheus (остальные есть только в JSON lines)
+LABEL_ATTRIBUTES = ("cache", "kind", "chart", "tab", "error")
+
+_lock = threading.Lock()  # Замеры приходят из фоновых потоков
+_spans = deque(maxlen=MAX_SPANS)
+_stats = {}  # (этап, метки) -> {"count", "sum_ms", "max_ms", "buckets"}
+_next_seq = 1  # Порядковый номер следующего замера
+_exported_seq = 0  # Номер последнего замера, выгруженного в JSON lines
+
+
+def record_span(name, duration_ms, **attributes):
+    """Сохраняет готовый замер этапа name длительностью duration_ms."""
+    global _next_seq
+    labels = tuple((key, str(attributes[key])) for key in LABEL_ATTRIBUTES if key in attributes)
+    with _lock:
+        _spans.append({"seq": _next_seq, "name": name, "time": time.time(), "duration_ms": round(duration_ms, 3), **attributes})
+        _next_seq += 1
+        stats = _stats.get((name, labels))
+        if stats is None:
+            stats = _stats[(name, labels)] = {"count": 0, "sum_ms": 0.0, "max_ms": 0.0, "buckets": [0] * len(HISTOGRAM_BUCKETS_MS)}
+        stats["count"] += 1
+        stats["sum_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                stats["buckets"][i] += 1
+
+
+@contextmanager
+def span(name, **attributes):
+    """Замеряет время блока with. В словарь attributes можно добавлять сведения по ходу дела."""
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except Exception:
+        attributes["error"] = True
+        raise
+    finally:
+        record_span(name, (time.perf_counter() - start) * 1000, **attributes)
+
+
+def timed(name, **attributes):
+    """Декоратор: замеряет каждый вызов функции как этап name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def recent_spans(limit=None):
+    """Последние замеры, от старых к новым."""
+    with _lock:
+        spans = list(_spans)
+    return spans[-limit:] if limit else spans
+
+
+def summary():
+    """Сводка по этапам: [(этап, метки, число, среднее мс, максимум мс)], от самых долгих в сумме."""
+    with _lock:
+        items = [(name, dict(labels), stats["count"], stats["sum_ms"], stats["max_ms"]) for (name, labels), stats in _stats.items()]
+    items.sort(key=lambda item: item[3], reverse=True)
+    return [(name, labels, count, total / count, max_ms) for name, labels, count, total, max_ms in items]
+
+
+def export_jsonl(path):
+    """Дописывает в файл JSON lines замеры, появившиеся после прошлой выгрузки. Возвращает число записанных строк."""
+    global _exported_seq
+    with _lock:
+        spans = [item for item in _spans if item["seq"] > _exported_seq]
+    with open(path, "a", encoding="utf-8") as f:
+        for item in spans:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    if spans:
+        with _lock:
+            _exported_seq = max(_exported_seq, spans[-1]["seq"])
+    return len(spans)
+
+
+def escape_label(value):
+    """Экранирует значение метки Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Сводка в текстовом формате Prometheus (гистограмма ai_weather_stage_duration_seconds)."""
+    with _lock:
+        items = sorted((key, dict(stats, buckets=list(stats["buckets"]))) for key, stats in _stats.items())
+    lines = [
+        "# HELP ai_weather_stage_duration_seconds Время этапов AI Weather.",
+        "# TYPE ai_weather_stage_duration_seconds histogram"
+    ]
+    for (name, labels), stats in items:
+        label_text = ",".join([f'stage="{name}"'] + [f'{key}="{escape_label(value)}"' for key, value in labels])
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS, stats["buckets"]):
+            lines.append(f'ai_weather_stage_duration_seconds_bucket{{{label_text},le="{bound / 1000:g}"}} {count}')
+        lines.append(f'ai_weather_stage_duration_seconds_bucket{{{label_text},le="+Inf"}} {stats["count"]}')
+        lines.append(f"ai_weather_stage_duration_seconds_sum{{{label_text}}} {stats['sum_ms'] / 1000:.6f}")
+        lines.append(f"ai_weather_stage_duration_seconds_count{{{label_text}}} {stats['count']}")
+    return "\n".join(lines) + "\n"
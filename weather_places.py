@@ -0,0 +1,547 @@
+"""Встроенный справочник городов: координаты без Nominatim и подсказки при вводе названия.
+
+Исходный список - data/cities.tsv (название, страна, население, широта, долгота, другие
+названия через запятую). Он собирается из выгрузки GeoNames cities15000 (города с населением
+от 15 000): python -m weather_places --build --geonames cities15000.txt. Страна, координаты,
+население и другие названия (латиницей и кириллицей) берутся из GeoNames. Основное название -
+русское: для крупных городов из data/names_ru.tsv, для остальных городов России - то из
+кириллических названий GeoNames, которое дает название GeoNames при транслитерации BGN/PCGN.
+У прочих городов основное название - название GeoNames.
+
+Из data/cities.tsv собираются массивы NumPy в data/gazetteer/ (python -m weather_places --build).
+Массивы открываются через отображение в память, поэтому справочник не читается целиком при запуске:
+    cities.npy      - записи городов, отсортированные по ключу названия
+    keys.npy        - ключи normalize_city_name всех названий городов, по возрастанию
+                      (поиск по названию делением пополам)
+    key_rows.npy    - номера городов для тех же ключей
+    grid_cells.npy  - номера ячеек сетки GRID_CELL_DEGREES, по возрастанию
+    grid_rows.npy   - номера городов в тех же ячейках (поиск ближайшего города)
+
+Подсказки берутся из истории пользователя и справочника. Названия приводятся к ключу
+normalize_city_name, поэтому "Моск", "моск" и "Mosk" находят Москву. Поиск идет по началу
+названия или любого слова в нем, а если совпадений мало - по похожему написанию (общим
+триграммам), чтобы находить города с опечатками.
+"""
+import os
+import re
+import sys
+import math
+import bisect
+import argparse
+import threading
+import unicodedata
+import numpy as np
+from weather_core import normalize_city_name
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CITIES_PATH = os.path.join(DATA_DIR, "cities.tsv")
+RUSSIAN_NAMES_PATH = os.path.join(DATA_DIR, "names_ru.tsv")  # Номер GeoNames -> русское название
+GAZETTEER_DIR = os.path.join(DATA_DIR, "gazetteer")
+GAZETTEER_FILES = ("cities.npy", "keys.npy", "key_rows.npy", "grid_cells.npy", "grid_rows.npy")
+GEONAMES_URL = "https://download.geonames.org/export/dump/cities15000.zip"
+MIN_POPULATION = 15000  # Города меньше в справочник не попадают
+NAME_SIZE = 64  # Байт UTF-8 на название
+KEY_SIZE = 32  # Байт UTF-8 на ключ; более длинные названия ищутся через Nominatim
+GAZETTEER_DTYPE = np.dtype([
+    ("name", f"S{NAME_SIZE}"), ("country", "S2"), ("population", "<u4"), ("latitude", "<f4"), ("longitude", "<f4")
+])
+GRID_CELL_DEGREES = 1.0
+GRID_COLUMNS = int(360 / GRID_CELL_DEGREES)
+KM_PER_DEGREE = 111.2
+EARTH_RADIUS_KM = 6371.0
+NEAREST_MAX_DISTANCE_KM = 50.0  # Дальше ближайший город уже не считается "этим местом"
+SUGGESTION_LIMIT = 8
+MIN_FUZZY_LENGTH = 3  # Опечатки ищем, когда введено хотя бы 3 символа
+MIN_TRIGRAM_SHARE = 0.4  # Доля триграмм введенного текста, которые должны быть в похожем названии
+
+
+class Place:
+    """Город из справочника. У городов только из истории нет страны и координат."""
+    __slots__ = ("name", "country", "population", "latitude", "longitude", "alternate_names")
+
+    def __init__(self, name, country="", population=0, latitude=None, longitude=None, alternate_names=()):
+        self.name = name
+        self.country = country
+        self.population = population
+        self.latitude = latitude
+        self.longitude = longitude
+        self.alternate_names = alternate_names  # Другие названия (Moscow для Москвы)
+
+    def label(self):
+        """Подпись для списка подсказок: "Москва, RU"."""
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+
+def load_places(path=CITIES_PATH):
+    """Читает справочник городов (TSV с заголовком)."""
+    places = []
+    with open(path, "r", encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            name, country, population, latitude, longitude = fields[:5]
+            alternate_names = tuple(alias for alias in fields[5].split(",") if alias) if len(fields) > 5 else ()
+            places.append(Place(name, country, int(population), float(latitude), float(longitude), alternate_names))
+    return places
+
+
+def save_places(places, path=CITIES_PATH):
+    """Записывает справочник городов в TSV (через временный файл)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("name\tcountry\tpopulation\tlatitude\tlongitude\talternate_names\n")
+        for place in places:
+            f.write(
+                f"{place.name}\t{place.country}\t{place.population}\t{place.latitude:.4f}\t{place.longitude:.4f}\t"
+                f"{','.join(place.alternate_names)}\n"
+            )
+    os.replace(tmp_path, path)
+
+
+def load_russian_names(path=RUSSIAN_NAMES_PATH):
+    """Русские названия городов по номерам GeoNames: {номер: название}."""
+    names = {}
+    with open(path, "r", encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            geonameid, name = line.rstrip("\n").split("\t")[:2]
+            names[geonameid] = name
+    return names
+
+
+# Транслитерация BGN/PCGN, которой GeoNames записывает названия городов России
+ROMANIZATION = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "ж": "zh", "з": "z", "и": "i", "й": "y",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y",
+    "ь": "", "э": "e", "ю": "yu", "я": "ya"
+}
+RUSSIAN_LETTERS = re.compile(r"[а-яё][а-яё' .’-]*", re.IGNORECASE)
+# Кириллические написания, которых нет в русском языке: украинские "-ський", "-ець", твердый знак
+# болгарского языка ("Москъва"), "мь" перед согласной ("Коломьна")
+NOT_RUSSIAN = re.compile(r"[сц]ьк|ньск|ць\b|ъ(?![еёюя])|мь[бвгджзйклмнпрстфхцчшщ]", re.IGNORECASE)
+
+
+def romanize(name, yo="yo"):
+    """Название латиницей по BGN/PCGN (ключ normalize_city_name): "Екатеринбург" -> "yekaterinburg"."""
+    letters = []
+    previous = " "
+    for char in name.lower():
+        if char in "её":
+            # В начале слова и после гласной е и ё пишутся через y
+            prefix = "y" if previous in "аеёиоуыэюяьъй" or not previous.isalpha() else ""
+            letters.append(prefix + ("e" if char == "е" else yo))
+        else:
+            letters.append(ROMANIZATION.get(char, char))
+        previous = char
+    return normalize_city_name("".join(letters))
+
+
+def edit_distance(a, b):
+    """Расстояние Левенштейна между строками."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def russian_name(name, alternate_names):
+    """Русское название города России среди кириллических названий GeoNames или None.
+
+    GeoNames пишет название города России транслитерацией BGN/PCGN русского названия, поэтому
+    выбирается название, транслитерация которого ближе всего к name. Среди одинаково близких -
+    с тем же числом дефисов, с мягким знаком (в белорусском и болгарском его часто нет) и самое
+    похожее на остальные кириллические названия.
+    """
+    cyrillic = [alias for alias in alternate_names if RUSSIAN_LETTERS.fullmatch(alias)]
+    candidates = {alias for alias in cyrillic if not NOT_RUSSIAN.search(alias)}
+    # "Грозны" рядом с "Грозный" - усеченная форма
+    candidates = sorted(alias for alias in candidates if alias + "й" not in candidates)
+    if not candidates:
+        return None
+    target = normalize_city_name(re.sub("['’ʹ]", "", name))
+
+    def distance(alias):
+        return min(edit_distance(romanize(alias), target), edit_distance(romanize(alias, yo="e"), target))
+
+    def score(alias):
+        return (
+            distance(alias), alias.count("-") != name.count("-"), -alias.count("ь"),
+            sum(edit_distance(alias.lower(), other.lower()) for other in cyrillic), alias
+        )
+
+    best = min(candidates, key=score)
+    return best if distance(best) <= max(1, len(target) // 4) else None
+
+
+def is_input_name(name):
+    """Можно ли ввести название с русской или латинской клавиатуры (и это не код аэропорта "MOW")."""
+    if not name or (name.isupper() and len(name) <= 4):
+        return False
+    return all("LATIN" in unicodedata.name(char, "") or "CYRILLIC" in unicodedata.name(char, "") for char in name if char.isalpha())
+
+
+def load_geonames(path, russian_names=None):
+    """Читает выгрузку GeoNames (cities15000.txt) в список городов для data/cities.tsv.
+
+    russian_names - {номер GeoNames: русское название} для городов, у которых основным должно
+    быть именно это название.
+    """
+    russian_names = russian_names or {}
+    places = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            geonameid, geonames_name, ascii_name, aliases = fields[:4]
+            latitude, longitude, country, population = fields[4], fields[5], fields[8], fields[14]
+            if not population or int(population) < MIN_POPULATION:
+                continue
+            aliases = [alias for alias in aliases.split(",") if is_input_name(alias)]
+            name = russian_names.get(geonameid)
+            if name is None and country == "RU":
+                name = russian_name(geonames_name, aliases)
+            name = name or geonames_name
+            # Другие названия без повторов ключа: "Moskva" и "Moskvá" дают один ключ
+            keys = {normalize_city_name(name)}
+            alternate_names = []
+            for alias in [geonames_name, ascii_name] + aliases:
+                key = normalize_city_name(alias)
+                if key and key not in keys and len(key.encode("utf-8")) <= KEY_SIZE:
+                    keys.add(key)
+                    alternate_names.append(alias)
+            places.append(Place(name, country, int(population), float(latitude), float(longitude), tuple(alternate_names)))
+    places.sort(key=lambda place: -place.population)
+    return places
+
+
+def grid_cells_of(latitudes, longitudes):
+    """Номера ячеек сетки для массивов координат."""
+    rows = np.floor((np.clip(latitudes, -90, 89.999) + 90) / GRID_CELL_DEGREES).astype(np.int64)
+    columns = np.floor(np.mod(np.asarray(longitudes, dtype=np.float64) + 180, 360) / GRID_CELL_DEGREES).astype(np.int64)
+    return rows * GRID_COLUMNS + columns
+
+
+def grid_cell(latitude, longitude):
+    """Номер ячейки сетки для одной точки (без NumPy: для одного числа так в разы быстрее)."""
+    row = int((min(max(latitude, -90), 89.999) + 90) // GRID_CELL_DEGREES)
+    column = int(((longitude + 180) % 360) // GRID_CELL_DEGREES)
+    return row * GRID_COLUMNS + column
+
+
+def distance_km(latitude, longitude, latitudes, longitudes):
+    """Расстояния по поверхности Земли от точки до массива точек (формула гаверсинусов)."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes.astype(np.float64)), np.radians(longitudes.astype(np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def build_gazetteer(places):
+    """Собирает массивы справочника из списка городов: (cities, keys, key_rows, grid_cells, grid_rows)."""
+    rows = []
+    for place in places:
+        key = normalize_city_name(place.name).encode("utf-8")
+        name = place.name.encode("utf-8")
+        if place.population >= MIN_POPULATION and key and len(key) <= KEY_SIZE and len(name) <= NAME_SIZE:
+            rows.append((key, -place.population, name, place))
+    # По ключу, а среди одинаковых названий - сначала крупные города
+    rows.sort(key=lambda row: row[:2])
+    cities = np.array(
+        [(name, place.country.encode("ascii"), place.population, place.latitude, place.longitude) for _, _, name, place in rows],
+        dtype=GAZETTEER_DTYPE
+    )
+    # Ключи всех названий: основного и других (без повторов у одного города)
+    names = []
+    for row, (key, population, _, place) in enumerate(rows):
+        city_keys = {key}
+        for alias in place.alternate_names:
+            alias_key = normalize_city_name(alias).encode("utf-8")
+            if alias_key and len(alias_key) <= KEY_SIZE and alias_key not in city_keys:
+                city_keys.add(alias_key)
+                names.append((alias_key, population, row))
+        names.append((key, population, row))
+    names.sort()
+    keys = np.array([key for key, _, _ in names], dtype=f"S{KEY_SIZE}")
+    key_rows = np.array([row for _, _, row in names], dtype=np.uint32)
+    cells = grid_cells_of(cities["latitude"], cities["longitude"])
+    grid_rows = np.argsort(cells, kind="stable").astype(np.uint32)
+    grid_cells = cells[grid_rows].astype(np.uint32)
+    return cities, keys, key_rows, grid_cells, grid_rows
+
+
+def save_gazetteer(arrays, directory=GAZETTEER_DIR):
+    """Записывает массивы справочника в папку directory."""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in zip(GAZETTEER_FILES, arrays):
+        tmp_path = os.path.join(directory, name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+
+def is_gazetteer_stale(directory=GAZETTEER_DIR, source=CITIES_PATH):
+    """Нужно ли пересобрать массивы: их нет или список городов изменился позже."""
+    paths = [os.path.join(directory, name) for name in GAZETTEER_FILES]
+    if not all(os.path.exists(path) for path in paths):
+        return True
+    return os.path.exists(source) and os.path.getmtime(source) > min(os.path.getmtime(path) for path in paths)
+
+
+def load_gazetteer(directory=GAZETTEER_DIR, source=CITIES_PATH):
+    """Открывает справочник через отображение в память (при необходимости пересобирает его)."""
+    if is_gazetteer_stale(directory, source):
+        arrays = build_gazetteer(load_places(source))
+        try:
+            save_gazetteer(arrays, directory)
+        except OSError as e:
+            print(f"Не удалось сохранить справочник городов: {e}")
+            return Gazetteer(*arrays)
+    return Gazetteer(*(np.load(os.path.join(directory, name), mmap_mode="r") for name in GAZETTEER_FILES))
+
+
+class Gazetteer:
+    """Справочник городов: поиск по названию и ближайшего города по координатам."""
+
+    def __init__(self, cities, keys, key_rows, grid_cells, grid_rows):
+        # np.asarray убирает обертку memmap (данные по-прежнему читаются из файла), операции с ней медленнее
+        self.cities = np.asarray(cities)
+        self.keys = np.asarray(keys)
+        self.key_rows = np.asarray(key_rows)
+        self.grid_cells = np.asarray(grid_cells)
+        self.grid_rows = np.asarray(grid_rows)
+
+    def __len__(self):
+        return len(self.cities)
+
+    def place(self, row):
+        """Город по номеру записи."""
+        city = self.cities[row]
+        return Place(
+            city["name"].decode("utf-8"), city["country"].decode("ascii"), int(city["population"]),
+            round(float(city["latitude"]), 4), round(float(city["longitude"]), 4)
+        )
+
+    def lookup(self, city_name):
+        """Самый крупный город с таким названием (основным или другим) или None."""
+        key = normalize_city_name(city_name).encode("utf-8")
+        if not key or len(key) > KEY_SIZE:
+            return None
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.place(int(self.key_rows[i]))
+        return None
+
+    def nearest(self, latitude, longitude, max_distance_km=NEAREST_MAX_DISTANCE_KM):
+        """Ближайший город не дальше max_distance_km: (город, расстояние в км) или None."""
+        # Просматриваем только ячейки сетки, в которых может лежать точка на таком расстоянии
+        lat_cells = math.ceil(max_distance_km / KM_PER_DEGREE / GRID_CELL_DEGREES)
+        widest = min(abs(latitude) + lat_cells * GRID_CELL_DEGREES, 89.0)
+        lon_cells = min(math.ceil(max_distance_km / (KM_PER_DEGREE * math.cos(math.radians(widest))) / GRID_CELL_DEGREES), GRID_COLUMNS // 2)
+        # Ячейки одной полосы широт идут подряд, поэтому на полосу нужен один диапазон
+        # (или два, если полоса пересекает 180-й меридиан)
+        ranges = []
+        for d_lat in range(-lat_cells, lat_cells + 1):
+            cell_latitude = latitude + d_lat * GRID_CELL_DEGREES
+            if not -90 <= cell_latitude < 90:
+                continue
+            first = grid_cell(cell_latitude, longitude - lon_cells * GRID_CELL_DEGREES)
+            last = grid_cell(cell_latitude, longitude + lon_cells * GRID_CELL_DEGREES)
+            if lon_cells * 2 + 1 >= GRID_COLUMNS:
+                row_start = first - first % GRID_COLUMNS
+                ranges.append((row_start, row_start + GRID_COLUMNS - 1))
+            elif first <= last:
+                ranges.append((first, last))
+            else:
+                ranges.append((first, first - first % GRID_COLUMNS + GRID_COLUMNS - 1))
+                ranges.append((last - last % GRID_COLUMNS, last))
+        bounds = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        starts = np.searchsorted(self.grid_cells, bounds[:, 0], side="left")
+        ends = np.searchsorted(self.grid_cells, bounds[:, 1], side="right")
+        candidates = [self.grid_rows[start:end] for start, end in zip(starts, ends) if start < end]
+        if not candidates:
+            return None
+        rows = np.unique(np.concatenate(candidates))
+        distances = distance_km(latitude, longitude, self.cities["latitude"][rows], self.cities["longitude"][rows])
+        best = int(np.argmin(distances))
+        if distances[best] > max_distance_km:
+            return None
+        return self.place(int(rows[best])), float(distances[best])
+
+
+def trigrams(key):
+    """Множество триграмм ключа (с пробелами по краям, чтобы учитывать начало слова)."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def suggestion_names(places):
+    """Ключи названий для подсказок: основное название и русские написания из других названий.
+
+    Ключи транслитерируются, поэтому "Paris" и "Париж" и так находятся по "par", а десятки
+    латинских названий крупного города на разных языках только замедлили бы сборку индекса
+    и засорили бы подсказки.
+    """
+    names = []
+    for i, place in enumerate(places):
+        keys = {normalize_city_name(place.name)}
+        for alias in place.alternate_names:
+            if RUSSIAN_LETTERS.fullmatch(alias) and not NOT_RUSSIAN.search(alias):
+                keys.add(normalize_city_name(alias))
+        names.extend((key, i) for key in sorted(keys))
+    return names
+
+
+class CityIndex:
+    """Индекс городов: отсортированные ключи для поиска по префиксу и триграммы для опечаток.
+
+    names - ключи названий [(ключ, номер города)], по умолчанию только основные названия.
+    lookup - поиск города по любому названию для городов из истории, по умолчанию среди names.
+    """
+
+    def __init__(self, places, names=None, lookup=None):
+        self.places = places
+        self.lookup = lookup
+        if names is None:
+            names = [(normalize_city_name(place.name), i) for i, place in enumerate(places)]
+        self.name_rows = [i for _, i in names]  # Номер названия -> номер города
+        self.by_key = {}  # Ключ названия -> номер самого крупного города с таким названием
+        self.keys = []  # (ключ с начала названия или с одного из слов, номер города)
+        self.trigram_index = {}  # Триграмма -> номера названий
+        self.trigram_counts = []
+        for n, (key, i) in enumerate(names):
+            if key not in self.by_key or places[i].population > places[self.by_key[key]].population:
+                self.by_key[key] = i
+            words = key.split()
+            for j in range(len(words)):
+                self.keys.append((" ".join(words[j:]), i))
+            grams = trigrams(key)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(n)
+        self.keys.sort()
+
+    def find_prefix(self, key):
+        """Номера городов, у которых название или одно из слов начинается с key."""
+        found = set()
+        i = bisect.bisect_left(self.keys, (key,))
+        while i < len(self.keys) and self.keys[i][0].startswith(key):
+            found.add(self.keys[i][1])
+            i += 1
+        return found
+
+    def find_similar(self, key):
+        """Номера городов с похожим написанием, от самых похожих.
+
+        Название подходит, если в нем есть не меньше MIN_TRIGRAM_SHARE триграмм введенного текста:
+        введено обычно только начало названия ("новсиб"), и доля от всех триграмм длинного
+        названия была бы слишком мала. Из подходящих выше те, что ближе по длине (мера Жаккара).
+        """
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for n in self.trigram_index.get(gram, ()):
+                shared[n] = shared.get(n, 0) + 1
+        best = {}  # Номер города -> сходство самого похожего из его названий
+        for n, count in shared.items():
+            share = count / len(grams)
+            if share < MIN_TRIGRAM_SHARE:
+                continue
+            similarity = (share, count / (len(grams) + self.trigram_counts[n] - count))
+            i = self.name_rows[n]
+            if similarity > best.get(i, (0, 0)):
+                best[i] = similarity
+        scored = sorted((-share, -jaccard, -self.places[i].population, i) for i, (share, jaccard) in best.items())
+        return [i for _, _, _, i in scored]
+
+    def find_place(self, name):
+        """Город с таким названием или None."""
+        if self.lookup is not None:
+            return self.lookup(name)
+        i = self.by_key.get(normalize_city_name(name))
+        return self.places[i] if i is not None else None
+
+    def search(self, text, history=(), limit=SUGGESTION_LIMIT):
+        """Подсказки для введенного текста: сначала города из истории, затем крупные города."""
+        key = normalize_city_name(text)
+        if not key:
+            return []
+        suggestions = []
+        seen = set()
+        for name in history:
+            name_key = normalize_city_name(name)
+            if not (name_key.startswith(key) or any(word.startswith(key) for word in name_key.split())):
+                continue
+            # Город из справочника учитываем по основному названию: "Paris" и "Париж" - один город
+            place = self.find_place(name) or Place(name)
+            place_key = normalize_city_name(place.name)
+            if place_key not in seen:
+                seen.add(place_key)
+                suggestions.append(place)
+        found = sorted(self.find_prefix(key), key=lambda i: -self.places[i].population)
+        if len(suggestions) + len(found) < limit and len(key) >= MIN_FUZZY_LENGTH:
+            found += [i for i in self.find_similar(key) if i not in found]
+        for i in found:
+            name_key = normalize_city_name(self.places[i].name)
+            if name_key not in seen:
+                seen.add(name_key)
+                suggestions.append(self.places[i])
+        return suggestions[:limit]
+
+
+_gazetteer = None
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Возвращает встроенный справочник городов (открывается при первом обращении)."""
+    global _gazetteer
+    with _index_lock:
+        if _gazetteer is None:
+            try:
+                _gazetteer = load_gazetteer()
+            except (OSError, ValueError) as e:
+                print(f"Не удалось прочитать справочник городов {CITIES_PATH}: {e}")
+                _gazetteer = Gazetteer(*build_gazetteer([]))
+        return _gazetteer
+
+
+def get_city_index():
+    """Возвращает индекс подсказок по встроенному справочнику (строится при первом обращении)."""
+    global _index
+    gazetteer = get_gazetteer()
+    with _index_lock:
+        if _index is None:
+            try:
+                places = load_places()
+            except (OSError, ValueError) as e:
+                print(f"Не удалось прочитать справочник городов {CITIES_PATH}: {e}")
+                places = []
+            _index = CityIndex(places, suggestion_names(places), gazetteer.lookup)
+        return _index
+
+
+def main(argv=None):
+    """Пересобирает массивы справочника из data/cities.tsv (и сам data/cities.tsv из выгрузки GeoNames)."""
+    parser = argparse.ArgumentParser(prog="python -m weather_places", description="Встроенный справочник городов AI Weather")
+    parser.add_argument("--build", action="store_true", help="собрать data/gazetteer/ из data/cities.tsv")
+    parser.add_argument("--geonames", metavar="cities15000.txt", help=f"сначала собрать data/cities.tsv из выгрузки GeoNames ({GEONAMES_URL})")
+    args = parser.parse_args(argv)
+    if not args.build:
+        parser.print_help()
+        return 0
+    if args.geonames:
+        places = load_geonames(args.geonames, load_russian_names())
+        save_places(places)
+        print(f"Городов из GeoNames: {len(places)}, файл {CITIES_PATH}")
+    arrays = build_gazetteer(load_places())
+    save_gazetteer(arrays)
+    print(f"Городов в справочнике: {len(arrays[0])}, папка {GAZETTEER_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""HTTP-сервис AI Weather: прогноз и рекомендации в формате JSON для других программ.
+
+Пример: python -m weather_server --port 8080
+    GET /forecast?city=Москва&days=3&hourly=1
+    GET /recommendation?city=Москва
+    GET /health
+    GET /metrics  (замеры этапов в формате Prometheus)
+
+Все клиенты пользуются общим кэшем: готовые ответы хранятся в памяти до начала следующего
+часа, а под ним лежат дисковые кэши weather_core (OpenMeteo, координаты, ответы нейросети).
+Одинаковые запросы, пришедшие одновременно, объединяются в один запрос к внешнему сервису,
+а частота запросов к OpenMeteo, Nominatim и GigaChat ограничивается.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import weather_core
+import weather_metrics
+from weather_comfort import current_comfort, comfort_to_json
+
+SERVER_WORKERS = 8
+MEMORY_CACHE_SIZE = 1000  # Готовых ответов в памяти
+NOT_FOUND_TTL = 300  # Сколько секунд помнить, что Nominatim не нашел город
+# Ограничения внешних сервисов: (минимальный интервал между запросами в секундах, одновременных запросов)
+UPSTREAM_LIMITS = {
+    "openmeteo": (0.1, 4),  # Бесплатный тариф: до 600 запросов в минуту
+    "nominatim": (1.0, 1),  # Правила Nominatim: не больше 1 запроса в секунду
+    "gigachat": (0.5, 1)
+}
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HTTP_STATUSES = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 502: "Bad Gateway"}
+
+
+class HttpError(Exception):
+    """Ошибка, которая возвращается клиенту с кодом status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class UpstreamLimiter:
+    """Ограничивает частоту и число одновременных запросов к внешнему сервису."""
+
+    def __init__(self, min_interval, max_concurrent):
+        self.min_interval = min_interval
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.lock = asyncio.Lock()
+        self.next_time = 0.0
+
+    async def run(self, executor, func, *args):
+        """Выполняет блокирующую функцию в пуле потоков, соблюдая ограничения."""
+        async with self.semaphore:
+            async with self.lock:
+                delay = self.next_time - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.next_time = time.monotonic() + self.min_interval
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+class WeatherService:
+    """Общий кэш и объединение одинаковых запросов для всех клиентов сервера."""
+
+    def __init__(self, workers=SERVER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.memory = OrderedDict()  # Ключ -> (время истечения, значение)
+        self.inflight = {}  # Ключ -> задача, которую ждут все одинаковые запросы
+        self.limiters = {name: UpstreamLimiter(*limits) for name, limits in UPSTREAM_LIMITS.items()}
+
+    async def single_flight(self, key, compute):
+        """Возвращает значение из памяти или вычисляет его один раз для всех ожидающих."""
+        cached = self.memory.get(key)
+        if cached and cached[0] > time.time():
+            self.memory.move_to_end(key)
+            return cached[1]
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.compute_and_store(key, compute))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self.inflight.pop(key, None))
+        # shield: если клиент отключится, остальные ожидающие все равно получат ответ
+        return await asyncio.shield(task)
+
+    async def compute_and_store(self, key, compute):
+        """Вычисляет значение и кладет его в память до начала следующего часа."""
+        value = await compute()
+        self.remember(key, value, weather_core.seconds_until_next_hour())
+        return value
+
+    def remember(self, key, value, ttl):
+        """Кладет значение в память на ttl секунд и вытесняет самые давно использованные."""
+        self.memory[key] = (time.time() + ttl, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > MEMORY_CACHE_SIZE:
+            self.memory.popitem(last=False)
+
+    async def get_coordinates(self, city_name):
+        """Координаты города: без сети (кэш, справочник) или одним запросом к Nominatim на город."""
+        local = weather_core.get_local_coordinates(city_name)
+        if local:
+            return local[0]
+        city_key = weather_core.normalize_city_name(city_name)
+        not_found = self.memory.get(("not_found", city_key))
+        if not_found and not_found[0] > time.time():
+            raise weather_core.CityNotFoundError(not_found[1])
+
+        async def compute():
+            return await self.limiters["nominatim"].run(self.executor, weather_core.get_coordinates, city_name)
+
+        try:
+            return await self.single_flight(("coordinates", city_key), compute)
+        except weather_core.CityNotFoundError as e:
+            # Повторные запросы неизвестного города не должны занимать лимит Nominatim
+            self.remember(("not_found", city_key), str(e), NOT_FOUND_TTL)
+            raise
+
+    async def get_forecast(self, city_name, days):
+        """Прогноз (Forecast) для города на days дней."""
+        async def compute():
+            coordinates = await self.get_coordinates(city_name)
+            forecasts = await self.limiters["openmeteo"].run(self.executor, weather_core.fetch_forecasts, [coordinates], days)
+            return forecasts[0]
+
+        return await self.single_flight(("forecast", weather_core.normalize_city_name(city_name), days), compute)
+
+    async def get_answer(self, kind, current):
+        """Ответ нейросети (kind из PROMPTS): из кэша или одним запросом к GigaChat."""
+        answer = weather_core.get_cached_answer(kind, current)
+        if answer is not None:
+            return answer
+
+        async def compute():
+            return await self.limiters["gigachat"].run(self.executor, weather_core.ask_giga_cached, kind, current)
+
+        return await self.single_flight(("answer", kind, weather_core.weather_cache_key(current)), compute)
+
+    async def forecast_body(self, city_name, days, hourly):
+        """Ответ /forecast в виде готового JSON."""
+        async def compute():
+            forecast = await self.get_forecast(city_name, days)
+            result = {"city": city_name}
+            result.update(forecast.to_dict())
+            result["comfort_index"] = comfort_to_json(current_comfort(forecast.current))
+            if not hourly:
+                del result["hourly"]
+            return json.dumps(result, ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+        return await self.single_flight(("forecast_body", weather_core.normalize_city_name(city_name), days, hourly), compute)
+
+    async def recommendation_body(self, city_name):
+        """Ответ /recommendation в виде готового JSON."""
+        async def compute():
+            forecast = await self.get_forecast(city_name, 7)
+            comfort, recommendation = await asyncio.gather(
+                self.get_answer("comfort", forecast.current),
+                self.get_answer("recommendation", forecast.current)
+            )
+            result = {"city": city_name, "comfort_index": comfort_to_json(current_comfort(forecast.current)), "comfort": comfort, "recommendation": recommendation}
+            return json.dumps(result, ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+        return await self.single_flight(("recommendation_body", weather_core.normalize_city_name(city_name)), compute)
+
+    async def dispatch(self, method, target):
+        """Выбирает обработчик по адресу запроса и возвращает (код, тело ответа, тип содержимого)."""
+        if method != "GET":
+            raise HttpError(405, "Поддерживается только GET")
+        url = urlsplit(target)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path == "/health":
+            return 200, json.dumps({"status": "ok", "cache_entries": len(self.memory), "inflight": len(self.inflight)}).encode("utf-8"), JSON_CONTENT_TYPE
+        if url.path == "/metrics":
+            return 200, weather_metrics.prometheus_text().encode("utf-8"), PROMETHEUS_CONTENT_TYPE
+        if url.path not in ("/forecast", "/recommendation"):
+            raise HttpError(404, f"Неизвестный адрес {url.path}")
+        city_name = query.get("city", "").strip()
+        if not city_name:
+            raise HttpError(400, "Не указан город (параметр city)")
+        try:
+            if url.path == "/recommendation":
+                return 200, await self.recommendation_body(city_name), JSON_CONTENT_TYPE
+            try:
+                days = int(query.get("days", 7))
+            except ValueError:
+                raise HttpError(400, "Параметр days должен быть числом")
+            if not 1 <= days <= 16:
+                raise HttpError(400, "Параметр days должен быть от 1 до 16")
+            return 200, await self.forecast_body(city_name, days, query.get("hourly") in ("1", "true")), JSON_CONTENT_TYPE
+        except weather_core.CityNotFoundError as e:
+            raise HttpError(404, str(e))
+        except HttpError:
+            raise
+        except Exception as e:
+            print(f"Ошибка при запросе: {e}")
+            raise HttpError(502, f"Ошибка внешнего сервиса: {e}")
+
+    async def handle_client(self, reader, writer):
+        """Обслуживает соединение: HTTP/1.1 с keep-alive, по одному запросу за раз."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body, content_type = 400, json.dumps({"error": "Неверный запрос"}, ensure_ascii=False).encode("utf-8"), JSON_CONTENT_TYPE
+                    keep_alive = False
+                else:
+                    method, target, version = parts
+                    # Строка запроса прочитана как latin-1; адрес с байтами UTF-8 (curl ".../forecast?city=Москва") переводим обратно
+                    target = target.encode("latin-1").decode("utf-8", "replace")
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                    try:
+                        status, body, content_type = await self.dispatch(method, target)
+                    except HttpError as e:
+                        status, body, content_type = e.status, json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"), JSON_CONTENT_TYPE
+
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_STATUSES[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """Останавливает пул потоков."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host, port, workers):
+    """Запускает сервер и обслуживает клиентов до остановки."""
+    service = WeatherService(workers)
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"AI Weather: http://{host}:{port}/forecast?city=Москва")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    """Разбирает аргументы и запускает сервер."""
+    parser = argparse.ArgumentParser(prog="python -m weather_server", description="HTTP-сервис прогноза погоды AI Weather")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="порт (по умолчанию 8080)")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="потоков для запросов к внешним сервисам")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())